@@ -3,21 +3,42 @@ import sys
 import random
 import time
 import os
-from collections import deque
+import argparse
+import json
+import queue
+import threading
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-# For Audio Recording
-import pyaudio
+# For Audio Recording (optional - runs without it record video only)
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
 import wave
 
 # OpenCV for Video Recording
 import cv2
 import numpy as np
 
+# Maze generation and solving come from the backend's maze engine, so the
+# videos use the same mazes as the game. maze_engine is not an installed
+# package: it is imported from the backend/ folder next to this script
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from maze_engine import (FOOD_EMOJIS, build_collector_path, create_maze_grid,
+                         generate_random_maze, get_all_food_positions)
+
 # ------------------------------------------------------------------
-# Number of BFS runs *per* script execution
+# Number of BFS runs *per* script execution (override with --runs)
 # ------------------------------------------------------------------
 NUM_RUNS = 1
 
+# Where session folders are created (override with --out)
+OUTPUT_DIR = r"D:\TigerWorld"
+
+# Sound effects, also mixed into the synthesized track in headless mode
+SOUND_FILES = {'munch': 'munch.wav', 'tiger': 'tiger_sound.wav'}
+
 # Set your audio loopback device index
 LOOPBACK_DEVICE_INDEX = 0
 
@@ -34,12 +55,6 @@ WALL_COLOR = (120, 60, 0)
 
 # Emojis
 TIGER_EMOJI = '🐯'
-# A fun set of “tiger-friendly” food emojis
-FOOD_EMOJIS = [
-    '🍗', '🍖', '🍔', '🍟', '🍕',
-    '🌭', '🍣', '🍤', '🍲', '🍜',
-    '🥩', '🍱', '🧀', '🍗', '🥓'
-]
 
 # Footprint emoji for the trail
 TRAIL_EMOJI = '🐾'
@@ -54,148 +69,401 @@ MAZE_ROWS = 15
 MAZE_COLS = 15
 CELL_SIZE = None
 
+# ------------------------------------------------------------------
+# Glyph cache - every emoji/text surface is rasterized once per run
+# ------------------------------------------------------------------
+class GlyphCache:
+    """
+    Pre-rasterized surfaces keyed by (font, text, colour).
+    TrueType emoji rendering is by far the most expensive call in a frame,
+    so each glyph is rendered on first use and blitted from here after.
+    Only fixed strings are cached whole; changing text (the HUD counter) is
+    drawn with blit_text, so the cache stays bounded however long the run.
+    """
+    def __init__(self):
+        self.surfaces = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, font, text, color):
+        key = (font, text, color)
+        surf = self.surfaces.get(key)
+        if surf is None:
+            surf = font.render(text, True, color)
+            self.surfaces[key] = surf
+            self.misses += 1
+        else:
+            self.hits += 1
+        return surf
+    
+    def preload(self, font, texts, color):
+        for text in texts:
+            self.get(font, text, color)
+    
+    def blit_text(self, surface, font, label, value, color, pos):
+        """Draw a cached label, then `value` one cached character at a time. Returns the drawn rect."""
+        x, y = pos
+        rect = surface.blit(self.get(font, label, color), (x, y))
+        x = rect.right
+        for ch in value:
+            char_rect = surface.blit(self.get(font, ch, color), (x, y))
+            rect.union_ip(char_rect)
+            x = char_rect.right
+        return rect
+
+glyphs = GlyphCache()
+
+class FrameTimer:
+    """Accumulates per-frame render time so speedups can be measured."""
+    def __init__(self):
+        self.frames = 0
+        self.total = 0.0
+        self._start = 0.0
+    
+    def start(self):
+        self._start = time.perf_counter()
+    
+    def stop(self):
+        self.total += time.perf_counter() - self._start
+        self.frames += 1
+    
+    def report(self, label):
+        if self.frames:
+            avg_ms = self.total / self.frames * 1000
+            print(f" => {label}: {avg_ms:.2f} ms/frame render over {self.frames} frames")
+
+# ------------------------------------------------------------------
+# Render clock - wall clock, or a simulated one for offline renders
+# ------------------------------------------------------------------
+class RenderClock:
+    """
+    Time source and frame pacing for the render loops.
+    Real time: wall-clock seconds, with tick()/wait() sleeping as before.
+    Offline (fps given): every tick()/wait() advances time by exactly
+    1/fps without sleeping, so each segment emits a fixed frame count and
+    renders as fast as the CPU allows.
+    """
+    def __init__(self, fps=None):
+        self.fps = fps
+        self.frames = 0
+        self.clock = None if fps else pygame.time.Clock()
+    
+    @property
+    def offline(self):
+        return self.fps is not None
+    
+    def time(self):
+        if self.offline:
+            return self.frames / self.fps
+        return time.time()
+    
+    def tick(self, framerate):
+        if self.offline:
+            self.frames += 1
+        else:
+            self.clock.tick(framerate)
+    
+    def wait(self, ms):
+        if self.offline:
+            self.frames += 1
+        else:
+            pygame.time.wait(ms)
+
+# ------------------------------------------------------------------
+# Video frame sink - encoding runs off the render thread
+# ------------------------------------------------------------------
+class FrameSink:
+    """
+    Feeds screen frames to a cv2.VideoWriter on a background thread.
+    A 32-bit surface with red in the high byte already holds BGRA in memory,
+    so the render loop only memcpy's the raw pixels into one of a fixed pool
+    of reusable buffers and the encoder thread drops the alpha byte. Other
+    pixel formats go through a surfarray view with the channels reversed by
+    stride. When the encoder falls behind, capture() waits for a free buffer
+    instead of queueing frames without bound.
+    """
+    def __init__(self, video_writer, width, height, buffers=8, surface=None):
+        self.video_writer = video_writer
+        surface = surface or pygame.display.get_surface()
+        self.bgra = (surface is not None and surface.get_bitsize() == 32
+                     and surface.get_masks()[:3] == (0xFF0000, 0x00FF00, 0x0000FF))
+        channels = 4 if self.bgra else 3
+        self.free = queue.Queue()
+        for _ in range(buffers):
+            self.free.put(np.empty((height, width, channels), dtype=np.uint8))
+        self.filled = queue.Queue()
+        self.bgr = np.empty((height, width, 3), dtype=np.uint8)
+        self.frames = 0
+        self.thread = threading.Thread(target=self._encode, daemon=True)
+        self.thread.start()
+    
+    def capture(self, surface):
+        buf = self.free.get()
+        if self.bgra:
+            height, width = buf.shape[:2]
+            raw = np.frombuffer(surface.get_buffer(), dtype=np.uint8)
+            np.copyto(buf, raw.reshape(height, surface.get_pitch() // 4, 4)[:, :width])
+            del raw
+        else:
+            pixels = pygame.surfarray.pixels3d(surface)  # (w, h, rgb) view, locks the surface
+            np.copyto(buf, pixels.transpose(1, 0, 2)[:, :, ::-1])
+            del pixels
+        self.filled.put(buf)
+        self.frames += 1
+    
+    def _encode(self):
+        while True:
+            buf = self.filled.get()
+            if buf is None:
+                break
+            if self.bgra:
+                cv2.cvtColor(buf, cv2.COLOR_BGRA2BGR, dst=self.bgr)
+                self.video_writer.write(self.bgr)
+            else:
+                self.video_writer.write(buf)
+            self.free.put(buf)
+    
+    def close(self):
+        self.filled.put(None)
+        self.thread.join()
+        self.video_writer.release()
+
 # ------------------------------------------------------------------
 # Audio Recording Functions
 # ------------------------------------------------------------------
+AUDIO_CHANNELS = 2
+AUDIO_RATE = 44100
+AUDIO_CHUNK = 1024
+AUDIO_SAMPLE_WIDTH = 2      # paInt16
+AUDIO_RING_SECONDS = 4      # capture slack before samples are dropped
+AUDIO_FLUSH_SECONDS = 0.5   # WAV writes happen in chunks this large
+AUDIO_RETRY_SECONDS = 0.01  # first back-off after a failed read, doubling up to
+AUDIO_RETRY_MAX_SECONDS = 0.5
+AUDIO_MAX_READ_ERRORS = 20  # consecutive failed reads before capture gives up
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size byte ring between the capture thread and the WAV writer.
+    Writes that do not fit are truncated to whole frames and counted as
+    overflows; nothing ever blocks the capture thread.
+    """
+    def __init__(self, capacity, frame_bytes):
+        self.frame_bytes = frame_bytes
+        self.capacity = capacity - capacity % frame_bytes
+        self.buf = bytearray(self.capacity)
+        self.start = 0
+        self.size = 0
+        self.closed = False
+        self.overflows = 0
+        self.dropped_bytes = 0
+        self.cond = threading.Condition()
+    
+    def write(self, data):
+        with self.cond:
+            free = self.capacity - self.size
+            if len(data) > free:
+                self.overflows += 1
+                keep = free - free % self.frame_bytes
+                self.dropped_bytes += len(data) - keep
+                data = data[:keep]
+            n = len(data)
+            end = (self.start + self.size) % self.capacity
+            first = min(n, self.capacity - end)
+            self.buf[end:end + first] = data[:first]
+            self.buf[:n - first] = data[first:]
+            self.size += n
+            self.cond.notify()
+    
+    def read(self, min_bytes, timeout=None):
+        """Wait for at least min_bytes (or close) and take everything buffered."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.size >= min_bytes or self.closed, timeout)
+            n = self.size
+            first = min(n, self.capacity - self.start)
+            data = bytes(self.buf[self.start:self.start + first]) + bytes(self.buf[:n - first])
+            self.start = (self.start + n) % self.capacity
+            self.size = 0
+            return data
+    
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class AudioRecorder:
+    """
+    Records an input stream to a WAV file independently of the frame rate.
+    A capture thread keeps reading the stream into a ring buffer and a
+    writer thread flushes it to the WAV file in large chunks. Works with any
+    object that has PyAudio's read/stop_stream/close stream methods.
+    Failed reads back off exponentially, and after AUDIO_MAX_READ_ERRORS
+    in a row capture stops (the WAV keeps what was recorded so far).
+    """
+    def __init__(self, stream, wf, chunk=AUDIO_CHUNK,
+                 ring_seconds=AUDIO_RING_SECONDS, flush_seconds=AUDIO_FLUSH_SECONDS):
+        self.stream = stream
+        self.wf = wf
+        self.chunk = chunk
+        frame_bytes = wf.getnchannels() * wf.getsampwidth()
+        rate = wf.getframerate()
+        self.flush_bytes = int(rate * flush_seconds) * frame_bytes
+        self.ring = AudioRingBuffer(int(rate * ring_seconds) * frame_bytes, frame_bytes)
+        self.expected_bytes = chunk * frame_bytes
+        self.underruns = 0
+        self.read_errors = 0
+        self.frames_written = 0
+        self.running = True
+        self.capture_thread = threading.Thread(target=self._capture, daemon=True)
+        self.writer_thread = threading.Thread(target=self._write, daemon=True)
+        self.capture_thread.start()
+        self.writer_thread.start()
+    
+    def _capture(self):
+        failures = 0
+        while self.running:
+            try:
+                data = self.stream.read(self.chunk, exception_on_overflow=False)
+            except IOError as e:
+                self.underruns += 1
+                self.read_errors += 1
+                failures += 1
+                if failures >= AUDIO_MAX_READ_ERRORS:
+                    print(f"Audio capture stopped after {failures} failed reads: {e}")
+                    break
+                # Back off so a failing device doesn't spin this thread
+                time.sleep(min(AUDIO_RETRY_MAX_SECONDS, AUDIO_RETRY_SECONDS * 2 ** (failures - 1)))
+                continue
+            failures = 0
+            if len(data) < self.expected_bytes:
+                self.underruns += 1
+            if data:
+                self.ring.write(data)
+        self.ring.close()
+    
+    def _write(self):
+        frame_bytes = self.ring.frame_bytes
+        while True:
+            data = self.ring.read(self.flush_bytes)
+            if data:
+                self.wf.writeframes(data)
+                self.frames_written += len(data) // frame_bytes
+            elif self.ring.closed:
+                break
+    
+    def stop(self):
+        self.running = False
+        self.capture_thread.join()
+        self.writer_thread.join()
+        self.stream.stop_stream()
+        self.stream.close()
+        self.wf.close()
+    
+    def report(self):
+        seconds = self.frames_written / self.wf.getframerate()
+        return (f"{seconds:.2f}s audio, {self.ring.overflows} overflows "
+                f"({self.ring.dropped_bytes} bytes dropped), {self.underruns} underruns "
+                f"({self.read_errors} failed reads)")
+
+
 def start_audio_recording(audio_filepath, p):
-    FORMAT = pyaudio.paInt16
-    CHANNELS = 2
-    RATE = 44100
-    CHUNK = 1024
-
-    stream = p.open(format=FORMAT,
-                    channels=CHANNELS,
-                    rate=RATE,
+    """Open the loopback device and start recording it in the background."""
+    stream = p.open(format=pyaudio.paInt16,
+                    channels=AUDIO_CHANNELS,
+                    rate=AUDIO_RATE,
                     input=True,
-                    frames_per_buffer=CHUNK,
+                    frames_per_buffer=AUDIO_CHUNK,
                     input_device_index=LOOPBACK_DEVICE_INDEX)
     
     wf = wave.open(audio_filepath, 'wb')
-    wf.setnchannels(CHANNELS)
-    wf.setsampwidth(p.get_sample_size(FORMAT))
-    wf.setframerate(RATE)
+    wf.setnchannels(AUDIO_CHANNELS)
+    wf.setsampwidth(p.get_sample_size(pyaudio.paInt16))
+    wf.setframerate(AUDIO_RATE)
     
-    return stream, wf
+    return AudioRecorder(stream, wf)
 
-def capture_audio_chunk(stream, wf):
-    try:
-        data = stream.read(1024, exception_on_overflow=False)
-        wf.writeframes(data)
-    except IOError:
-        pass
+def stop_audio_recording(recorder):
+    recorder.stop()
+    print(f" => Audio capture: {recorder.report()}")
 
-def stop_audio_recording(stream, wf):
-    stream.stop_stream()
-    stream.close()
-    wf.close()
+class SoundTrack:
+    """
+    Audio track for runs without a loopback device: every sound effect is
+    cued at the video frame it was played on and mixed into a WAV file at
+    the end, so the track lines up with the video by construction.
+    """
+    def __init__(self, fps, rate=AUDIO_RATE):
+        self.fps = fps
+        self.rate = rate
+        self.samples = {}
+        self.cues = []
+        for name, path in SOUND_FILES.items():
+            self.load(name, path)
+    
+    def load(self, name, path):
+        """Read a WAV file as int16 stereo at the track's rate; missing files stay silent."""
+        try:
+            with wave.open(path, 'rb') as wf:
+                width = wf.getsampwidth()
+                channels = wf.getnchannels()
+                rate = wf.getframerate()
+                data = wf.readframes(wf.getnframes())
+        except (OSError, EOFError, wave.Error):
+            return False
+        if width == 1:
+            samples = (np.frombuffer(data, dtype=np.uint8).astype(np.int16) - 128) << 8
+        elif width == 2:
+            samples = np.frombuffer(data, dtype='<i2')
+        else:
+            return False
+        samples = samples.reshape(-1, channels)[:, :AUDIO_CHANNELS]
+        if samples.shape[1] < AUDIO_CHANNELS:
+            samples = np.repeat(samples, AUDIO_CHANNELS, axis=1)
+        if rate != self.rate and len(samples):
+            positions = np.arange(int(len(samples) * self.rate / rate)) * rate / self.rate
+            samples = np.stack([np.interp(positions, np.arange(len(samples)), samples[:, c])
+                                for c in range(AUDIO_CHANNELS)], axis=1)
+        self.samples[name] = samples.astype(np.int16)
+        return True
+    
+    def cue(self, name, frame):
+        if name in self.samples:
+            self.cues.append((frame, name))
+    
+    def write(self, audio_filepath, frames):
+        """Mix every cue into a track exactly `frames` video frames long."""
+        mix = np.zeros((int(frames * self.rate / self.fps), AUDIO_CHANNELS), dtype=np.int32)
+        for frame, name in self.cues:
+            start = int(frame * self.rate / self.fps)
+            clip = self.samples[name][:max(0, len(mix) - start)]
+            mix[start:start + len(clip)] += clip
+        with wave.open(audio_filepath, 'wb') as wf:
+            wf.setnchannels(AUDIO_CHANNELS)
+            wf.setsampwidth(AUDIO_SAMPLE_WIDTH)
+            wf.setframerate(self.rate)
+            wf.writeframes(np.clip(mix, -32768, 32767).astype('<i2').tobytes())
 
 # ------------------------------------------------------------------
-# Maze & BFS Helpers
+# API sessions
 # ------------------------------------------------------------------
-def generate_random_maze(rows, cols):
-    maze = [['#' for _ in range(cols)] for _ in range(rows)]
-    directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]
-    
-    def in_bounds(x, y):
-        return 0 <= x < cols and 0 <= y < rows
-    
-    def carve(x, y):
-        maze[y][x] = '.'
-        random.shuffle(directions)
-        for dx, dy in directions:
-            nx, ny = x + 2*dx, y + 2*dy
-            if in_bounds(nx, ny) and maze[ny][nx] == '#':
-                maze[y + dy][x + dx] = '.'
-                carve(nx, ny)
-    
-    carve(0, 0)
-    return maze
-
-def bfs_path(grid, start, goal):
-    rows = len(grid)
-    cols = len(grid[0]) if rows else 0
-    sx, sy = start
-    gx, gy = goal
-    
-    if not (0 <= sx < cols and 0 <= sy < rows):
-        return []
-    if not (0 <= gx < cols and 0 <= gy < rows):
-        return []
-    if grid[sy][sx] == '#' or grid[gy][gx] == '#':
-        return []
-    
-    queue = deque()
-    queue.append((sx, sy, [(sx, sy)]))
-    visited = set([(sx, sy)])
-    directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-    
-    while queue:
-        cx, cy, path = queue.popleft()
-        if (cx, cy) == (gx, gy):
-            return path
-        for dx, dy in directions:
-            nx, ny = cx + dx, cy + dy
-            if 0 <= nx < cols and 0 <= ny < rows:
-                if grid[ny][nx] != '#' and (nx, ny) not in visited:
-                    visited.add((nx, ny))
-                    queue.append((nx, ny, path + [(nx, ny)]))
-    return []
-
-def find_nearest_food(start, foods, grid):
-    if not foods:
-        return None
-    
-    rows = len(grid)
-    cols = len(grid[0]) if rows else 0
-    sx, sy = start
-    queue = deque()
-    queue.append((sx, sy))
-    visited = set([(sx, sy)])
-    directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-    
-    while queue:
-        cx, cy = queue.popleft()
-        if (cx, cy) in foods:
-            return (cx, cy)
-        for dx, dy in directions:
-            nx, ny = cx + dx, cy + dy
-            if 0 <= nx < cols and 0 <= ny < rows:
-                if grid[ny][nx] != '#' and (nx, ny) not in visited:
-                    visited.add((nx, ny))
-                    queue.append((nx, ny))
-    return None
-
-def build_collector_path(grid, start, food_positions, goal):
-    path = []
-    current = start
-    leftover_food = set(food_positions)
-    
-    while leftover_food:
-        nearest = find_nearest_food(current, leftover_food, grid)
-        if nearest is None:
-            return []
-        seg = bfs_path(grid, current, nearest)
-        if not seg:
-            return []
-        # Avoid duplicating the start cell when extending the path
-        if path:
-            seg = seg[1:]
-        path.extend(seg)
-        current = nearest
-        leftover_food.remove(nearest)
-    
-    final_seg = bfs_path(grid, current, goal)
-    if not final_seg:
-        return []
-    if path:
-        final_seg = final_seg[1:]
-    path.extend(final_seg)
-    return path
+def load_session(source):
+    """
+    Maze and collector path of a game created through the API: the JSON of
+    /api/admin/sessions/<game_id>, as a saved file or that URL (sent with
+    the ADMIN_TOKEN environment variable as X-Admin-Token).
+    """
+    if source.startswith(('http://', 'https://')):
+        request = urllib.request.Request(source, headers={'X-Admin-Token': os.environ.get('ADMIN_TOKEN', '')})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.load(response)
+    with open(source, encoding='utf-8') as f:
+        return json.load(f)
 
 # ------------------------------------------------------------------
 # Opening screen with swirling tiger emojis
 # ------------------------------------------------------------------
-def show_opening_screen(screen, video_writer, audio_stream, audio_wf, font):
+def show_opening_screen(screen, frame_sink, font, clock=None):
     """
     Show "WELCOME TO TIGER-WORLD" for ~3 seconds.
     Animate some tiger emojis swirling around the text.
@@ -211,9 +479,10 @@ def show_opening_screen(screen, video_writer, audio_stream, audio_wf, font):
     center_x = WIDTH // 2
     center_y = HEIGHT // 2
     
-    start_time = time.time()
+    clock = clock or RenderClock()
+    start_time = clock.time()
     
-    while time.time() - start_time < 3:
+    while clock.time() - start_time < 3:
         # black background
         screen.fill(BLACK)
         
@@ -225,26 +494,21 @@ def show_opening_screen(screen, video_writer, audio_stream, audio_wf, font):
         )
         
         # swirl tiger emojis
-        elapsed = time.time() - start_time
+        elapsed = clock.time() - start_time
         for i in range(TIGER_COUNT):
             angle = (elapsed * swirl_speed) + i*(2*np.pi/TIGER_COUNT)
             px = center_x + RADIUS * np.cos(angle)
             py = center_y + RADIUS * np.sin(angle)
             
             # Render the tiger
-            tiger_surf = font.render(TIGER_EMOJI, True, BROWN)
+            tiger_surf = glyphs.get(font, TIGER_EMOJI, BROWN)
             screen.blit(tiger_surf, (px - tiger_surf.get_width()/2,
                                      py - tiger_surf.get_height()/2))
         
         pygame.display.flip()
         
-        # capture audio
-        capture_audio_chunk(audio_stream, audio_wf)
         # capture video
-        frame_str = pygame.image.tostring(screen, 'RGB')
-        frame_np = np.frombuffer(frame_str, dtype=np.uint8).reshape((HEIGHT, WIDTH, 3))
-        frame_bgr = cv2.cvtColor(frame_np, cv2.COLOR_RGB2BGR)
-        video_writer.write(frame_bgr)
+        frame_sink.capture(screen)
         
         # check for close
         for event in pygame.event.get():
@@ -252,12 +516,12 @@ def show_opening_screen(screen, video_writer, audio_stream, audio_wf, font):
                 pygame.quit()
                 sys.exit()
         
-        pygame.time.wait(30)
+        clock.wait(30)
 
 # ------------------------------------------------------------------
 # Closing screen with repeated tiger sounds
 # ------------------------------------------------------------------
-def show_closing_screen(screen, video_writer, audio_stream, audio_wf, font):
+def show_closing_screen(screen, frame_sink, font, soundtrack=None, clock=None):
     thanks_text = (
         "🐯 THANKS FOR WATCHING 🐯\n"
         "🐯 TIGER-WORLD! 🐯\n"
@@ -285,58 +549,56 @@ def show_closing_screen(screen, video_writer, audio_stream, audio_wf, font):
     except:
         tiger_sound = None
     
-    start_time = time.time()
-    last_sound = 0
-    
-    while time.time() - start_time < 5:
-        if tiger_sound and (time.time() - last_sound > 1):
-            tiger_sound.play()
-            last_sound = time.time()
-        
-        capture_audio_chunk(audio_stream, audio_wf)
+    clock = clock or RenderClock()
+    start_time = clock.time()
+    last_sound = start_time - 2
+    
+    while clock.time() - start_time < 5:
+        if (tiger_sound or soundtrack) and (clock.time() - last_sound > 1):
+            if tiger_sound:
+                tiger_sound.play()
+            if soundtrack:
+                soundtrack.cue('tiger', frame_sink.frames)
+            last_sound = clock.time()
         
-        frame_str = pygame.image.tostring(screen, 'RGB')
-        frame_np = np.frombuffer(frame_str, dtype=np.uint8).reshape((HEIGHT, WIDTH, 3))
-        frame_bgr = cv2.cvtColor(frame_np, cv2.COLOR_RGB2BGR)
-        video_writer.write(frame_bgr)
+        frame_sink.capture(screen)
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
         
-        pygame.time.wait(30)
+        clock.wait(30)
 
 # ------------------------------------------------------------------
 # Maze BFS Sequence
 # ------------------------------------------------------------------
-def run_one_maze(run_index, p, session_dir):
-    global maze_font
+def run_one_maze(run_index, p, session_dir, seed=None, synth_audio=False, total_runs=NUM_RUNS,
+                 offline=False, session=None):
+    global maze_font, glyphs
     
     print(f"\n--- Starting Maze Run #{run_index+1} ---")
-    
-    # Generate Maze
-    maze_layout = generate_random_maze(MAZE_ROWS, MAZE_COLS)
-    maze_grid = []
-    for y in range(MAZE_ROWS):
-        row = []
-        for x in range(MAZE_COLS):
-            if maze_layout[y][x] == '.':
-                row.append(random.choice(FOOD_EMOJIS))
-            else:
-                row.append('#')
-        maze_grid.append(row)
-    
-    # Gather foods
-    all_food_positions = []
-    for y in range(MAZE_ROWS):
-        for x in range(MAZE_COLS):
-            if maze_grid[y][x] not in ['#', ' ']:
-                all_food_positions.append((x, y))
-    
-    start_cell = (0, 0)
-    goal_cell  = (MAZE_COLS - 1, MAZE_ROWS - 1)
-    collector_cells = build_collector_path(maze_grid, start_cell, all_food_positions, goal_cell)
+    if session is not None:
+        # Replay an API game's maze and collector path as dealt
+        print(f" => Game: {session.get('id')}")
+        maze_grid = [list(row) for row in session['maze_grid']]
+        start_cell = tuple(session['start'])
+        goal_cell  = tuple(session['goal'])
+        collector_cells = [tuple(cell) for cell in session.get('optimal_path') or []]
+        if not collector_cells:
+            collector_cells = build_collector_path(maze_grid, start_cell,
+                                                   get_all_food_positions(maze_grid), goal_cell)
+    else:
+        if seed is not None:
+            random.seed(seed)
+            print(f" => Seed: {seed}")
+        
+        # Generate Maze
+        maze_grid = create_maze_grid(generate_random_maze(MAZE_ROWS, MAZE_COLS))
+        start_cell = (0, 0)
+        goal_cell  = (MAZE_COLS - 1, MAZE_ROWS - 1)
+        collector_cells = build_collector_path(maze_grid, start_cell,
+                                               get_all_food_positions(maze_grid), goal_cell)
     success = (len(collector_cells) > 0)
     
     OFFSET_X = (WIDTH - MAZE_COLS * CELL_SIZE)//2
@@ -348,25 +610,30 @@ def run_one_maze(run_index, p, session_dir):
     ]
     
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption(f"Run {run_index+1}/{NUM_RUNS}")
-    
-    if maze_font is None:
-        maze_font = pygame.font.SysFont(FONT_NAME, FONT_SIZE)
+    pygame.display.set_caption(f"Run {run_index+1}/{total_runs}")
     
-    clock = pygame.time.Clock()
+    # pygame is re-initialised for every run, so fonts and glyphs are too
+    maze_font = pygame.font.SysFont(FONT_NAME, min(FONT_SIZE, CELL_SIZE))
+    glyphs = GlyphCache()
+    glyphs.preload(maze_font, FOOD_EMOJIS + [TRAIL_EMOJI], GOLD)
+    glyphs.preload(maze_font, [TIGER_EMOJI], BROWN)
+    frame_timer = FrameTimer()
     
     # Start audio
     audio_filepath = os.path.join(session_dir, f"run_{run_index+1}.wav")
-    audio_stream, audio_wf = start_audio_recording(audio_filepath, p)
+    recorder = start_audio_recording(audio_filepath, p) if p else None
     
     # Start video
     video_filepath = os.path.join(session_dir, f"run_{run_index+1}.mp4")
     fps = 30
+    clock = RenderClock(fps if offline else None)
     fourcc = cv2.VideoWriter_fourcc(*'mp4v')
     video_writer = cv2.VideoWriter(video_filepath, fourcc, fps, (WIDTH, HEIGHT))
+    frame_sink = FrameSink(video_writer, WIDTH, HEIGHT)
+    soundtrack = SoundTrack(fps) if synth_audio else None
     
     # 1) Opening
-    show_opening_screen(screen, video_writer, audio_stream, audio_wf, maze_font)
+    show_opening_screen(screen, frame_sink, maze_font, clock)
     
     # 2) Maze BFS
     current_target = 0
@@ -383,8 +650,65 @@ def run_one_maze(run_index, p, session_dir):
         munch_sound = None
         tiger_sound = None
     
+    # Static layer: walls, foods and paw prints are drawn once here and
+    # patched cell by cell as foods are eaten
+    background = pygame.Surface((WIDTH, HEIGHT)).convert()
+    paw_surf = glyphs.get(maze_font, TRAIL_EMOJI, GOLD)
+    paw_counts = {}
+    
+    def cell_rect(xx, yy):
+        return pygame.Rect(OFFSET_X + xx*CELL_SIZE, OFFSET_Y + yy*CELL_SIZE, CELL_SIZE, CELL_SIZE)
+    
+    def glyph_rect(surf, centerx, centery):
+        return surf.get_rect(topleft=(centerx - surf.get_width()//2,
+                                      centery - surf.get_height()//2))
+    
+    def draw_cell(xx, yy):
+        rect = cell_rect(xx, yy)
+        if maze_grid[yy][xx] == '#':
+            background.fill(WALL_COLOR, rect)
+        elif maze_grid[yy][xx] != ' ':
+            em_surf = glyphs.get(maze_font, maze_grid[yy][xx], GOLD)
+            background.blit(em_surf, (rect.x + (CELL_SIZE - em_surf.get_width())//2,
+                                      rect.y + (CELL_SIZE - em_surf.get_height())//2))
+    
+    def stamp_paw(px, py):
+        return background.blit(paw_surf, glyph_rect(paw_surf, px, py))
+    
+    def eat_cell(xx, yy):
+        """Erase a food and stamp its paw print, repainting whatever overlapped."""
+        rect = cell_rect(xx, yy)
+        em_surf = glyphs.get(maze_font, maze_grid[yy][xx], GOLD)
+        area = rect.unionall([
+            em_surf.get_rect(topleft=(rect.x + (CELL_SIZE - em_surf.get_width())//2,
+                                      rect.y + (CELL_SIZE - em_surf.get_height())//2)),
+            glyph_rect(paw_surf, rect.centerx, rect.centery)
+        ])
+        maze_grid[yy][xx] = ' '
+        
+        background.set_clip(area)
+        background.fill(BLACK)
+        neighbours = [(nx, ny) for ny in range(yy-1, yy+2) for nx in range(xx-1, xx+2)
+                      if 0 <= nx < MAZE_COLS and 0 <= ny < MAZE_ROWS]
+        for nx, ny in neighbours:
+            draw_cell(nx, ny)
+        for nx, ny in neighbours:
+            rect = cell_rect(nx, ny)
+            for _ in range(paw_counts.get((nx, ny), 0)):
+                stamp_paw(rect.centerx, rect.centery)
+        background.set_clip(None)
+        return area
+    
+    background.fill(BLACK)
+    for yy in range(MAZE_ROWS):
+        for xx in range(MAZE_COLS):
+            draw_cell(xx, yy)
+    screen.blit(background, (0, 0))
+    pygame.display.flip()
+    
     finished = False
-    trail_positions = []
+    dynamic_rects = []
+    total_steps = len(path_pixels)
     
     while not finished:
         for event in pygame.event.get():
@@ -392,6 +716,7 @@ def run_one_maze(run_index, p, session_dir):
                 pygame.quit()
                 sys.exit()
         
+        dirty = []
         if path_pixels and current_target < len(path_pixels):
             tx, ty = path_pixels[current_target]
             dx = tx - tiger_x
@@ -402,57 +727,42 @@ def run_one_maze(run_index, p, session_dir):
             tiger_y += (dy/dist)*speed
             if abs(dx) < 2 and abs(dy) < 2:
                 cx, cy = collector_cells[current_target]
+                # Leave a tiger paw print where we've been
+                paw_counts[(cx, cy)] = paw_counts.get((cx, cy), 0) + 1
                 if maze_grid[cy][cx] not in ['#',' ']:
-                    maze_grid[cy][cx] = ' '
                     if munch_sound:
                         munch_sound.play()
-                # Leave a tiger paw print where we've been
-                trail_positions.append((int(tx), int(ty)))
+                    if soundtrack:
+                        soundtrack.cue('munch', frame_sink.frames)
+                    dirty.append(eat_cell(cx, cy))
+                else:
+                    dirty.append(stamp_paw(int(tx), int(ty)))
                 current_target += 1
         else:
             finished = True
         
-        screen.fill(BLACK)
-        
-        # Draw Maze
-        for yy in range(MAZE_ROWS):
-            for xx in range(MAZE_COLS):
-                cell_px = OFFSET_X + xx*CELL_SIZE
-                cell_py = OFFSET_Y + yy*CELL_SIZE
-                if maze_grid[yy][xx] == '#':
-                    pygame.draw.rect(screen, WALL_COLOR, (cell_px, cell_py, CELL_SIZE, CELL_SIZE))
-                else:
-                    if maze_grid[yy][xx] != ' ':
-                        em_surf = maze_font.render(maze_grid[yy][xx], True, GOLD)
-                        sx = cell_px + (CELL_SIZE - em_surf.get_width())//2
-                        sy = cell_py + (CELL_SIZE - em_surf.get_height())//2
-                        screen.blit(em_surf, (sx, sy))
+        frame_timer.start()
         
-        # Draw the trail
-        for (px, py) in trail_positions:
-            paw_surf = maze_font.render(TRAIL_EMOJI, True, GOLD)
-            screen.blit(paw_surf, (px - paw_surf.get_width()//2,
-                                   py - paw_surf.get_height()//2))
+        # Restore the background under last frame's tiger and HUD
+        for rect in dynamic_rects + dirty:
+            screen.blit(background, rect, rect)
         
         # The Tiger
-        tiger_surf = maze_font.render(TIGER_EMOJI, True, BROWN)
-        screen.blit(tiger_surf, (tiger_x - tiger_surf.get_width()//2,
-                                 tiger_y - tiger_surf.get_height()//2))
+        tiger_surf = glyphs.get(maze_font, TIGER_EMOJI, BROWN)
+        tiger_rect = screen.blit(tiger_surf, (tiger_x - tiger_surf.get_width()//2,
+                                              tiger_y - tiger_surf.get_height()//2))
         
         # BFS Progress
-        total_steps = len(path_pixels)
-        info_surf = maze_font.render(f"Snacks: {current_target}/{total_steps}", True, GOLD)
-        screen.blit(info_surf, (10, HEIGHT - 25))
+        info_rect = glyphs.blit_text(screen, maze_font, "Snacks: ", f"{current_target}/{total_steps}",
+                                     GOLD, (10, HEIGHT - 25))
         
-        pygame.display.flip()
+        pygame.display.update(dynamic_rects + dirty + [tiger_rect, info_rect])
+        dynamic_rects = [tiger_rect, info_rect]
+        frame_timer.stop()
         clock.tick(60)
         
-        # capture audio/video
-        capture_audio_chunk(audio_stream, audio_wf)
-        frame_str = pygame.image.tostring(screen, 'RGB')
-        frame_np = np.frombuffer(frame_str, dtype=np.uint8).reshape((HEIGHT, WIDTH, 3))
-        frame_bgr = cv2.cvtColor(frame_np, cv2.COLOR_RGB2BGR)
-        video_writer.write(frame_bgr)
+        # capture video
+        frame_sink.capture(screen)
     
     # 3) Maze done
     screen.fill(BLACK)
@@ -466,55 +776,118 @@ def run_one_maze(run_index, p, session_dir):
                            HEIGHT//2 - end_surf.get_height()//2))
     pygame.display.flip()
     
-    t0 = time.time()
-    while time.time() - t0 < 2:
-        capture_audio_chunk(audio_stream, audio_wf)
-        frame_str = pygame.image.tostring(screen, 'RGB')
-        frame_np = np.frombuffer(frame_str, dtype=np.uint8).reshape((HEIGHT, WIDTH, 3))
-        frame_bgr = cv2.cvtColor(frame_np, cv2.COLOR_RGB2BGR)
-        video_writer.write(frame_bgr)
+    t0 = clock.time()
+    while clock.time() - t0 < 2:
+        frame_sink.capture(screen)
         clock.tick(30)
     
     # 4) Closing screen
-    show_closing_screen(screen, video_writer, audio_stream, audio_wf, maze_font)
+    show_closing_screen(screen, frame_sink, maze_font, soundtrack, clock)
     
     # finalize
-    video_writer.release()
-    stop_audio_recording(audio_stream, audio_wf)
-    
-    print(f" => Video: {video_filepath}\n => Audio: {audio_filepath}")
+    frame_sink.close()
+    if recorder:
+        stop_audio_recording(recorder)
+    if soundtrack:
+        soundtrack.write(audio_filepath, frame_sink.frames)
+    
+    frame_timer.report("Maze")
+    print(f" => Video: {video_filepath}")
+    if recorder or soundtrack:
+        print(f" => Audio: {audio_filepath}")
 
 # ------------------------------------------------------------------
 # MAIN
 # ------------------------------------------------------------------
-def main():
-    global CELL_SIZE
-    
-    # Instead of current folder, store in D:\TigerWorld
-    base_dir = r"D:\TigerWorld"
-    if not os.path.exists(base_dir):
-        os.makedirs(base_dir, exist_ok=True)
-    
-    # create a unique subfolder inside D:\TigerWorld
-    timestamp_str = time.strftime("%Y%m%d_%H%M%S")
-    session_dir = os.path.join(base_dir, f"maze_session_{timestamp_str}")
-    os.makedirs(session_dir, exist_ok=True)
+def render_run(run_index, session_dir, seed, audio, total_runs, offline=False, session=None):
+    """
+    Render one run in its own pygame instance.
+    Also the process-pool entry point, so it sets up every global it needs.
+    """
+    global CELL_SIZE, MAZE_ROWS, MAZE_COLS
     
-    # init PyAudio
-    p = pyaudio.PyAudio()
+    # API games come in their level's size
+    if session is not None:
+        MAZE_ROWS = len(session['maze_grid'])
+        MAZE_COLS = len(session['maze_grid'][0])
     
     # define cell size
     CELL_SIZE = min((WIDTH - BORDER*2)//MAZE_COLS,
                     (HEIGHT - BORDER*2)//MAZE_ROWS)
     
-    for i in range(NUM_RUNS):
-        pygame.init()
-        run_one_maze(i, p, session_dir)
+    p = pyaudio.PyAudio() if audio == 'record' else None
+    pygame.init()
+    try:
+        run_one_maze(run_index, p, session_dir, seed=seed,
+                     synth_audio=(audio == 'synth'), total_runs=total_runs, offline=offline,
+                     session=session)
+    finally:
         pygame.quit()
+        if p:
+            p.terminate()
+    return run_index
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render Tiger World maze videos")
+    parser.add_argument('--headless', action='store_true',
+                        help="render without a window (SDL dummy video driver)")
+    parser.add_argument('--offline', action='store_true',
+                        help="fixed timestep: advance 1/fps per frame and never sleep")
+    parser.add_argument('--runs', type=int, default=NUM_RUNS, help="number of videos to render")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="render runs in parallel, one pygame process each")
+    parser.add_argument('--out', default=OUTPUT_DIR, help="folder for session output")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="base seed; run N uses seed + N (default: random)")
+    parser.add_argument('--audio', choices=['none', 'record', 'synth'], default=None,
+                        help="loopback recording, a track mixed from the sound effects, "
+                             "or no audio (default: record, or synth when headless/offline)")
+    parser.add_argument('--session', default=None, metavar='FILE_OR_URL',
+                        help="render one API game instead of random mazes: a saved "
+                             "/api/admin/sessions/<game_id> response or that URL")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    audio = args.audio or ('synth' if args.headless or args.offline else 'record')
+    if audio == 'record' and args.offline:
+        print("offline renders run faster than real time - synthesizing audio instead")
+        audio = 'synth'
+    if audio == 'record' and pyaudio is None:
+        print("pyaudio not installed - recording video only")
+        audio = 'none'
+    if args.headless:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    
+    base_seed = args.seed if args.seed is not None else random.randrange(2**31)
+    session = load_session(args.session) if args.session else None
+    if session is not None:
+        args.runs = 1
+    
+    # create a unique subfolder inside the output folder
+    timestamp_str = time.strftime("%Y%m%d_%H%M%S")
+    session_dir = os.path.join(args.out, f"maze_session_{timestamp_str}")
+    os.makedirs(session_dir, exist_ok=True)
     
-    p.terminate()
+    started = time.perf_counter()
+    jobs = [(i, session_dir, base_seed + i, audio, args.runs, args.offline, session)
+            for i in range(args.runs)]
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(render_run, *job) for job in jobs]
+            for future in as_completed(futures):
+                future.result()
+    else:
+        for job in jobs:
+            render_run(*job)
+    elapsed = time.perf_counter() - started
     
-    print(f"\nAll {NUM_RUNS} BFS runs completed!\nFiles are stored in: {session_dir}\n")
+    print(f"\nAll {args.runs} BFS runs completed in {elapsed:.1f}s "
+          f"({args.runs / elapsed * 60:.1f} videos/min)\nFiles are stored in: {session_dir}\n")
 
 
 if __name__=="__main__":
@@ -30,6 +30,11 @@ def create_app():
         if database_url.startswith('postgres://'):
             database_url = database_url.replace('postgres://', 'postgresql://', 1)
         app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+        # Each gevent worker serves many requests at once; let more of them hold a connection
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', '10')),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', '20'))
+        }
     else:
         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'tigerworld.db')
     
@@ -37,12 +42,22 @@ def create_app():
     
     db.init_app(app)
     
+    from app import profiling, ratelimit
+    ratelimit.init_app(app)
+    profiling.init_app(app)
+    
     from app.api import bp as api_bp
+    from app.channel import sock
+    sock.init_app(app)
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    from app.stats import rebuild_stats_command
+    app.cli.add_command(rebuild_stats_command)
+    
     with app.app_context():
         from . import models
         db.create_all()
+        models.add_missing_columns()
     
     return app
 
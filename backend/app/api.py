@@ -1,13 +1,24 @@
 """REST API endpoints for Tiger World game"""
-from flask import Blueprint, jsonify, request
+import json
+
+from flask import Blueprint, Response, jsonify, request
 from app.game import (
     create_new_game,
+    create_endless_game,
+    get_game_chunk,
+    tick_ghosts,
+    get_hint,
+    get_game_render,
     get_game_state,
     update_game_progress,
     complete_game,
     get_leaderboard,
     get_level_config
 )
+from app import profiling
+from app.concurrency import run_cpu_bound
+from app.replay import decode_replay, parse_moves, replay_runs
+from app.stats import score_writer
 
 bp = Blueprint('api', __name__)
 
@@ -22,27 +33,22 @@ def health_check():
 def new_game():
     """
     Create a new game session.
-    Body: { "level": 1 }
+    Body: { "level": 1 } or { "mode": "endless", "seed": 42 }
     """
     data = request.get_json() or {}
     level = data.get('level', 1)
     
-    game_state = create_new_game(level=level)
+    if data.get('mode') == 'endless':
+        seed = data.get('seed')
+        if seed is not None and not isinstance(seed, int):
+            return jsonify({'error': 'seed must be an integer'}), 400
+        game = create_endless_game(seed=seed)
+        return jsonify(game.to_dict()), 201
     
-    # Don't send optimal_path to client (would spoil the game)
-    response = {
-        'id': game_state['id'],
-        'level': game_state['level'],
-        'rows': game_state['rows'],
-        'cols': game_state['cols'],
-        'maze_grid': game_state['maze_grid'],
-        'start': game_state['start'],
-        'goal': game_state['goal'],
-        'total_foods': game_state['total_foods'],
-        'status': game_state['status']
-    }
+    game = run_cpu_bound(create_new_game, level=level)
     
-    return jsonify(response), 201
+    # Don't send optimal_path to client (would spoil the game)
+    return jsonify(game.to_dict()), 201
 
 
 @bp.route('/game/<game_id>', methods=['GET'])
@@ -54,32 +60,86 @@ def get_game(game_id):
         return jsonify({'error': 'Game not found'}), 404
     
     # Return limited info (don't spoil the solution)
-    response = {
-        'id': game['id'],
-        'level': game['level'],
-        'rows': game['rows'],
-        'cols': game['cols'],
-        'maze_grid': game['maze_grid'],
-        'foods_collected': game['foods_collected'],
-        'total_foods': game['total_foods'],
-        'score': game['score'],
-        'status': game['status']
-    }
+    return jsonify(game.state_dict())
+
+
+@bp.route('/game/<game_id>/chunk', methods=['GET'])
+def get_chunk(game_id):
+    """
+    Get one chunk of an endless maze.
+    Query: ?cx=0&cy=0
+    """
+    cx = request.args.get('cx', type=int)
+    cy = request.args.get('cy', type=int)
+    if cx is None or cy is None:
+        return jsonify({'error': 'cx and cy are required integers'}), 400
+    
+    chunk = get_game_chunk(game_id, cx, cy)
+    
+    if 'error' in chunk:
+        status = 404 if chunk['error'] == 'Game not found' else 400
+        return jsonify(chunk), status
     
-    return jsonify(response)
+    return jsonify(chunk)
+
+
+@bp.route('/game/<game_id>/ghosts', methods=['POST'])
+def step_ghosts(game_id):
+    """
+    Advance the ghosts one tick.
+    Body: { "player": [3, 4] }
+    """
+    data = request.get_json() or {}
+    player = data.get('player')
+    if not (isinstance(player, list) and len(player) == 2 and all(isinstance(v, int) for v in player)):
+        return jsonify({'error': 'player must be [x, y]'}), 400
+    
+    result = tick_ghosts(game_id, (player[0], player[1]))
+    
+    if 'error' in result:
+        status = 404 if result['error'] == 'Game not found' else 400
+        return jsonify(result), status
+    
+    return jsonify(result)
+
+
+@bp.route('/game/<game_id>/hint', methods=['GET'])
+def hint(game_id):
+    """
+    Get the next step towards the nearest remaining food or the goal.
+    Query: ?x=3&y=4&target=food|goal
+    """
+    x = request.args.get('x', type=int)
+    y = request.args.get('y', type=int)
+    target = request.args.get('target', 'food')
+    if x is None or y is None:
+        return jsonify({'error': 'x and y are required integers'}), 400
+    if target not in ('food', 'goal'):
+        return jsonify({'error': 'target must be food or goal'}), 400
+    
+    result = get_hint(game_id, (x, y), target)
+    
+    if 'error' in result:
+        status = 404 if result['error'] == 'Game not found' else 400
+        return jsonify(result), status
+    
+    return jsonify(result)
 
 
 @bp.route('/game/<game_id>/progress', methods=['POST'])
 def update_progress(game_id):
     """
     Update game progress.
-    Body: { "foods_collected": 5, "time_elapsed": 12.5 }
+    Body: { "foods_collected": 5, "time_elapsed": 12.5, "eaten": [[1, 0], [2, 0]], "moves": "RRD" }
     """
     data = request.get_json() or {}
     foods_collected = data.get('foods_collected', 0)
     time_elapsed = data.get('time_elapsed', 0)
+    eaten = [tuple(c) for c in data.get('eaten') or []
+             if isinstance(c, list) and len(c) == 2 and all(isinstance(v, int) for v in c)]
+    moves = parse_moves(data.get('moves'))
     
-    game = update_game_progress(game_id, foods_collected, time_elapsed)
+    game = update_game_progress(game_id, foods_collected, time_elapsed, eaten, moves)
     
     if 'error' in game:
         return jsonify(game), 404
@@ -96,30 +156,21 @@ def update_progress(game_id):
 def finish_game(game_id):
     """
     Complete a game and add to leaderboard.
-    Body: { "player_name": "Player1", "time_elapsed": 45.2 }
+    Body: { "player_name": "Player1", "time_elapsed": 45.2, "moves": "DR" }
     """
     data = request.get_json() or {}
     player_name = data.get('player_name', 'Anonymous')
     time_elapsed = data.get('time_elapsed', 0)
+    moves = parse_moves(data.get('moves'))
     
-    game = complete_game(game_id, player_name, time_elapsed)
+    game = complete_game(game_id, player_name, time_elapsed, moves)
     
     if 'error' in game:
-        return jsonify(game), 404
+        return jsonify(game), 404 if game['error'] == 'Game not found' else 409
         
-    # Save to Database
-    try:
-        from app.models import Score
-        from app import db
-        new_score = Score(
-            player_name=player_name,
-            score=game['score'],
-            level=game['level']
-        )
-        db.session.add(new_score)
-        db.session.commit()
-    except Exception as e:
-        print(f"Error saving score: {e}")
+    # Save to Database, updating the leaderboard aggregates with it
+    replay = (game['id'], float(time_elapsed or 0), game['replay']) if game['replay'] else None
+    score_writer.add(player_name, game['score'], game['level'], replay=replay, mode=game['mode'])
     
     return jsonify({
         'id': game['id'],
@@ -149,6 +200,120 @@ def get_leaderboard_list():
     })
 
 
+@bp.route('/stats/levels', methods=['GET'])
+def get_level_stats():
+    """Games played, average and best score per level."""
+    from app.models import LevelStats
+    stats = LevelStats.query.order_by(LevelStats.level).all()
+    return jsonify({'levels': [s.to_dict() for s in stats]})
+
+
+@bp.route('/stats/daily', methods=['GET'])
+def get_daily_stats():
+    """
+    Best score of each day, most recent first.
+    Query: ?days=7
+    """
+    from app.models import DailyStats
+    days = min(request.args.get('days', 7, type=int), 365)
+    stats = DailyStats.query.order_by(DailyStats.day.desc()).limit(days).all()
+    return jsonify({'days': [s.to_dict() for s in stats]})
+
+
+@bp.route('/stats/players', methods=['GET'])
+def get_player_stats_list():
+    """
+    Players ranked by personal best.
+    Query: ?limit=10
+    """
+    from app.models import PlayerStats
+    limit = min(request.args.get('limit', 10, type=int), 100)
+    stats = PlayerStats.query.order_by(PlayerStats.best_score.desc()).limit(limit).all()
+    return jsonify({'players': [s.to_dict() for s in stats]})
+
+
+@bp.route('/stats/players/<player_name>', methods=['GET'])
+def get_player_stats(player_name):
+    """Personal bests and totals for one player."""
+    from app.models import PlayerStats
+    stats = PlayerStats.query.get(player_name)
+    if not stats:
+        return jsonify({'error': 'Player not found'}), 404
+    return jsonify(stats.to_dict())
+
+
+@bp.route('/replays', methods=['GET'])
+def get_replay_list():
+    """
+    Best replays, highest score first.
+    Query: ?level=3&limit=10
+    """
+    from app.models import Replay, Score
+    limit = min(request.args.get('limit', 10, type=int), 100)
+    query = Replay.query.join(Replay.score)
+    level = request.args.get('level', type=int)
+    if level is not None:
+        query = query.filter(Score.level == level)
+    replays = query.order_by(Score.score.desc()).limit(limit).all()
+    return jsonify({'replays': [r.to_dict() for r in replays]})
+
+
+@bp.route('/replays/<game_id>', methods=['GET'])
+def get_replay(game_id):
+    """
+    Stream a replay as newline-delimited JSON: one line with the game and
+    its maze ('#' wall, '.' food, ' ' empty), then one line per run of moves
+    with the cell it ends on.
+    """
+    from app.models import Replay
+    replay = Replay.query.filter_by(game_id=game_id).first()
+    if not replay:
+        return jsonify({'error': 'Replay not found'}), 404
+    
+    info = replay.to_dict()
+    try:
+        header, grid, moves = decode_replay(replay.data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def generate():
+        yield json.dumps(dict(info, **header, maze_grid=grid), separators=(',', ':')) + '\n'
+        for run in replay_runs(header, moves):
+            yield json.dumps(run, separators=(',', ':')) + '\n'
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
+@bp.route('/admin/profile', methods=['GET'])
+def get_profile_report():
+    """
+    Per-stage timing totals for this worker and the saved slow-request profiles.
+    Header: X-Admin-Token. Query: ?reset=1 clears the totals after reading.
+    """
+    if not profiling.ADMIN_TOKEN:
+        return jsonify({'error': 'Not found'}), 404
+    if not profiling.check_admin_token(request.headers.get('X-Admin-Token')):
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify(profiling.report(reset=request.args.get('reset') == '1'))
+
+
+@bp.route('/admin/sessions/<game_id>', methods=['GET'])
+def get_session_render(game_id):
+    """
+    A game's maze and collector path, for `TigerWorld.py --session`.
+    Header: X-Admin-Token.
+    """
+    if not profiling.ADMIN_TOKEN:
+        return jsonify({'error': 'Not found'}), 404
+    if not profiling.check_admin_token(request.headers.get('X-Admin-Token')):
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    result = run_cpu_bound(get_game_render, game_id)
+    if 'error' in result:
+        return jsonify(result), 404 if result['error'] == 'Game not found' else 400
+    return jsonify(result)
+
+
 @bp.route('/levels/<int:level>', methods=['GET'])
 def get_level_info(level):
     """Get information about a specific level."""
@@ -0,0 +1,86 @@
+"""WebSocket session channel for live game updates"""
+import json
+from typing import Optional, Tuple
+from flask_sock import Sock
+from app.api import bp
+from app.game import get_game_state, update_game_progress, tick_ghosts, get_hint
+from app.replay import parse_moves
+
+sock = Sock()
+
+# Frame types (client -> server):
+#   {"t": "p", "s": 1, "f": 5, "e": 12.5, "x": [[1, 0]], "v": "RRD"}
+#                                                         progress: foods, elapsed, eaten cells, moves
+#   {"t": "m", "s": 2, "p": [3, 4]}                       move: player cell, steps the ghosts
+#   {"t": "h", "s": 3, "p": [3, 4], "g": 1}                hint: towards food, or goal if "g"
+# Every frame is answered with an ack carrying the same sequence number:
+#   {"t": "a", "s": 1, ...} or {"t": "e", "s": 1, "error": "..."}
+
+
+def _cell(value) -> Optional[Tuple[int, int]]:
+    if isinstance(value, list) and len(value) == 2 and all(isinstance(v, int) for v in value):
+        return (value[0], value[1])
+    return None
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+
+def handle_frame(game_id: str, frame: dict) -> dict:
+    """
+    Apply one client frame to the session and build its ack.
+    Uses the same game functions as the REST endpoints.
+    """
+    seq = frame.get('s')
+    kind = frame.get('t')
+
+    if kind == 'p':
+        foods, elapsed = frame.get('f', 0), frame.get('e', 0)
+        if not isinstance(foods, int) or not _is_number(foods) or not _is_number(elapsed):
+            return {'t': 'e', 's': seq, 'error': 'f must be a whole number and e a number'}
+        eaten = [c for c in map(_cell, frame.get('x') or []) if c is not None]
+        game = update_game_progress(game_id, foods, elapsed, eaten, parse_moves(frame.get('v')))
+        if 'error' in game:
+            return {'t': 'e', 's': seq, 'error': game['error']}
+        return {'t': 'a', 's': seq, 'f': game['foods_collected'], 'sc': game['score'], 'st': game['status']}
+
+    if kind in ('m', 'h'):
+        player = _cell(frame.get('p'))
+        if player is None:
+            return {'t': 'e', 's': seq, 'error': 'p must be [x, y]'}
+        if kind == 'm':
+            result = tick_ghosts(game_id, player)
+            if 'error' in result:
+                return {'t': 'e', 's': seq, 'error': result['error']}
+            return {'t': 'a', 's': seq, 'g': [[g['x'], g['y']] for g in result['ghosts']]}
+        result = get_hint(game_id, player, 'goal' if frame.get('g') else 'food')
+        if 'error' in result:
+            return {'t': 'e', 's': seq, 'error': result['error']}
+        return {'t': 'a', 's': seq, 'n': result['next'], 'd': result['distance']}
+
+    return {'t': 'e', 's': seq, 'error': 'Unknown frame type'}
+
+
+@sock.route('/game/<game_id>/ws', bp=bp)
+def session_channel(ws, game_id):
+    """
+    Persistent channel for one game session.
+    Clients fall back to the REST endpoints if the upgrade fails.
+    """
+    if not get_game_state(game_id):
+        ws.send('{"t":"e","error":"Game not found"}')
+        return
+
+    while True:
+        message = ws.receive()
+        if message is None:
+            break
+        try:
+            frame = json.loads(message)
+        except ValueError:
+            frame = None
+        if not isinstance(frame, dict):
+            ws.send('{"t":"e","error":"Invalid frame"}')
+            continue
+        ws.send(json.dumps(handle_frame(game_id, frame), separators=(',', ':')))
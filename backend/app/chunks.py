@@ -0,0 +1,73 @@
+"""Chunked infinite maze for endless mode"""
+import random
+from collections import OrderedDict
+from typing import List, Tuple
+
+from maze_engine.generators import eller_rows
+from maze_engine.maze import add_loops, create_maze_grid
+
+# Chunks are CHUNK_SIZE x CHUNK_SIZE cells. The carved lattice fills the
+# first CHUNK_SIZE - 1 rows/cols; the last column and row are border walls
+# pierced by doors into the east and south neighbours.
+CHUNK_SIZE = 16
+
+# Doors per chunk edge (more than one adds loops across borders)
+DOORS_PER_EDGE = 2
+
+# Hot chunks kept per session; older ones are regenerated on demand
+CHUNK_CACHE_SIZE = 32
+
+
+def _edge_doors(seed: int, edge: str, cx: int, cy: int) -> List[int]:
+    """
+    Lattice offsets of the doors on a chunk's east or south edge.
+    Seeded by the edge itself, so both neighbours agree on where they are.
+    """
+    rng = random.Random(f"{seed}:{edge}:{cx}:{cy}")
+    lattice = list(range(0, CHUNK_SIZE - 1, 2))
+    return rng.sample(lattice, DOORS_PER_EDGE)
+
+
+def generate_chunk(seed: int, cx: int, cy: int) -> List[List[str]]:
+    """
+    Generate the emoji grid for chunk (cx, cy).
+    Deterministic for a (seed, cx, cy) triple. Each chunk is a connected
+    Eller maze and shares at least one door with each of its four
+    neighbours, so the whole infinite maze is connected.
+    """
+    rng = random.Random(f"{seed}:{cx}:{cy}")
+    inner = CHUNK_SIZE - 1
+
+    layout = [row + ['#'] for row in eller_rows(inner, inner, rng)]
+    layout.append(['#'] * CHUNK_SIZE)
+    add_loops(layout, rng)
+
+    for y in _edge_doors(seed, 'E', cx, cy):
+        layout[y][CHUNK_SIZE - 1] = '.'
+    for x in _edge_doors(seed, 'S', cx, cy):
+        layout[CHUNK_SIZE - 1][x] = '.'
+
+    return create_maze_grid(layout, rng)
+
+
+class ChunkCache:
+    """Per-session LRU of generated chunks, bounded to `capacity` entries."""
+
+    def __init__(self, seed: int, capacity: int = CHUNK_CACHE_SIZE):
+        self.seed = seed
+        self.capacity = capacity
+        self.chunks: 'OrderedDict[Tuple[int, int], List[List[str]]]' = OrderedDict()
+
+    def get(self, cx: int, cy: int) -> List[List[str]]:
+        """Return chunk (cx, cy), generating it and evicting the coldest if needed."""
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        chunk = generate_chunk(self.seed, cx, cy)
+        self.chunks[key] = chunk
+        if len(self.chunks) > self.capacity:
+            self.chunks.popitem(last=False)
+        return chunk
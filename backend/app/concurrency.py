@@ -0,0 +1,37 @@
+"""Keep CPU-bound and blocking work off the gevent event loop"""
+from typing import Callable, TypeVar
+
+from app.profiling import profile_offloaded
+
+T = TypeVar('T')
+
+
+def _gevent_hub():
+    """The worker's gevent hub, or None when not running under gevent."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return None
+    if not monkey.is_module_patched('socket'):
+        return None
+    import gevent
+    return gevent.get_hub()
+
+
+def under_gevent() -> bool:
+    """True in a gevent-patched worker."""
+    return _gevent_hub() is not None
+
+
+def run_cpu_bound(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Call `func` on one of gevent's native threads when the worker is
+    monkey-patched, so maze generation (or a call that blocks outside
+    gevent, like a SQLite lock wait) can't stall the greenlets serving
+    I/O-bound requests; call it directly under thread or sync workers.
+    A sampled request's profile follows `func` onto the native thread.
+    """
+    hub = _gevent_hub()
+    if hub is None:
+        return func(*args, **kwargs)
+    return hub.threadpool.apply(profile_offloaded(func), args, kwargs)
@@ -0,0 +1,180 @@
+"""Memory-mapped maze corpus shared by every worker process"""
+import mmap
+import os
+import random
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from maze_engine.maze import FOOD_EMOJIS
+
+# Folder holding the level_<n>.bin files written by scripts/build_corpus.py
+MAZE_CORPUS_DIR = os.environ.get(
+    'MAZE_CORPUS_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'corpus')
+)
+
+# Levels from here on share one maze size, generator and difficulty target,
+# so they all draw from the last level's file
+CORPUS_LEVELS = 11
+
+MAGIC = b'TWMC'
+VERSION = 1
+
+# magic, version, rows, cols, record size, record count
+HEADER = struct.Struct('<4sHHHHI')
+
+# Each record is: open-cell bitmap (1 bit per cell, row-major), one
+# FOOD_EMOJIS index byte per cell (NO_FOOD for walls), then this trailer:
+# collector path length, difficulty * 1000
+TRAILER = struct.Struct('<HH')
+
+NO_FOOD = 0xFF
+
+MazeRecord = Tuple[List[List[str]], int, float]
+
+
+def corpus_path(level: int, directory: str = MAZE_CORPUS_DIR) -> str:
+    return os.path.join(directory, f'level_{level}.bin')
+
+
+def record_size(rows: int, cols: int) -> int:
+    cells = rows * cols
+    return (cells + 7) // 8 + cells + TRAILER.size
+
+
+def encode_record(grid: List[List[str]], path_length: int, difficulty: float) -> bytes:
+    """Pack an emoji grid and its collector path length into one record."""
+    cells = [cell for row in grid for cell in row]
+    bitmap = bytearray((len(cells) + 7) // 8)
+    foods = bytearray(len(cells))
+    for i, cell in enumerate(cells):
+        if cell == '#':
+            foods[i] = NO_FOOD
+            continue
+        bitmap[i >> 3] |= 1 << (i & 7)
+        foods[i] = FOOD_EMOJIS.index(cell) if cell in FOOD_EMOJIS else NO_FOOD
+    return bytes(bitmap) + bytes(foods) + TRAILER.pack(min(path_length, 0xFFFF),
+                                                         round(difficulty * 1000))
+
+
+def decode_record(buf, offset: int, rows: int, cols: int) -> MazeRecord:
+    """Unpack the record at `offset` back into (grid, path length, difficulty)."""
+    cells = rows * cols
+    bitmap_size = (cells + 7) // 8
+    bitmap = buf[offset:offset + bitmap_size]
+    foods = buf[offset + bitmap_size:offset + bitmap_size + cells]
+    path_length, difficulty = TRAILER.unpack_from(buf, offset + bitmap_size + cells)
+
+    grid = []
+    for y in range(rows):
+        row = []
+        for i in range(y * cols, (y + 1) * cols):
+            if not bitmap[i >> 3] & (1 << (i & 7)):
+                row.append('#')
+            elif foods[i] == NO_FOOD:
+                row.append(' ')
+            else:
+                row.append(FOOD_EMOJIS[foods[i]])
+        grid.append(row)
+    return grid, path_length, difficulty / 1000
+
+
+def write_corpus(path: str, rows: int, cols: int, records: Iterable[bytes]) -> int:
+    """
+    Write a level file next to `path` and swap it in with os.replace, so
+    readers only ever see the old file or the complete new one.
+    Returns the number of records written.
+    """
+    size = record_size(rows, cols)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    count = 0
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, rows, cols, size, 0))
+            for record in records:
+                if len(record) != size:
+                    raise ValueError(f"Record is {len(record)} bytes, expected {size}")
+                f.write(record)
+                count += 1
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, rows, cols, size, count))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+class MazeCorpus:
+    """
+    Read-only mmap views of the level files, opened lazily per process.
+    Every worker maps the same files, so they share one page-cache copy.
+    A file swapped in by a rebuild is picked up on the next lookup.
+    """
+
+    def __init__(self, directory: str = MAZE_CORPUS_DIR):
+        self.directory = directory
+        self.files: Dict[int, Tuple[Tuple[int, int], mmap.mmap, int, int, int, int]] = {}
+
+    def _open(self, level: int):
+        path = corpus_path(level, self.directory)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.files.pop(level, None)
+            return None
+
+        key = (stat.st_ino, stat.st_mtime_ns)
+        entry = self.files.get(level)
+        if entry is not None and entry[0] == key:
+            return entry
+
+        try:
+            with open(path, 'rb') as f:
+                view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            print(f"Could not map maze corpus {path}: {e}")
+            return None
+
+        magic, version, rows, cols, size, count = HEADER.unpack_from(view, 0)
+        if (magic != MAGIC or version != VERSION or size != record_size(rows, cols)
+                or len(view) < HEADER.size + size * count):
+            print(f"Ignoring invalid maze corpus {path}")
+            view.close()
+            return None
+
+        entry = (key, view, rows, cols, size, count)
+        self.files[level] = entry
+        return entry
+
+    def count(self, level: int) -> int:
+        entry = self._open(min(level, CORPUS_LEVELS))
+        return entry[5] if entry else 0
+
+    def record(self, level: int, index: int) -> Optional[MazeRecord]:
+        """Decode record `index` of a level, or None if it does not exist."""
+        entry = self._open(min(level, CORPUS_LEVELS))
+        if entry is None or not 0 <= index < entry[5]:
+            return None
+        _, view, rows, cols, size, _ = entry
+        return decode_record(view, HEADER.size + index * size, rows, cols)
+
+    def random_record(self, level: int, rows: int, cols: int,
+                      rng: Optional[random.Random] = None) -> Optional[MazeRecord]:
+        """
+        Pick a random maze for a level in O(1), or None if the level has no
+        corpus file or its mazes are not rows x cols.
+        """
+        entry = self._open(min(level, CORPUS_LEVELS))
+        if entry is None or entry[5] == 0 or (entry[2], entry[3]) != (rows, cols):
+            return None
+        _, view, rows, cols, size, count = entry
+        index = (rng or random).randrange(count)
+        return decode_record(view, HEADER.size + index * size, rows, cols)
+
+
+# Shared by every request in this process
+maze_corpus = MazeCorpus()
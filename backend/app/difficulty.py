@@ -0,0 +1,206 @@
+"""Difficulty scoring and difficulty-targeted maze generation"""
+import os
+import random
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from app import profiling
+from app.concurrency import under_gevent
+from maze_engine.generators import DEFAULT_GENERATOR, generate_maze
+
+# How many candidate mazes to score per new game (1 disables targeting)
+MAZE_CANDIDATES = int(os.environ.get('MAZE_CANDIDATES', '6'))
+
+# Worker processes used to generate candidates (1 keeps it in-process).
+# Under gevent candidates are always generated in-process: a process pool
+# can't be started or shared from gevent's native threads
+MAZE_WORKERS = int(os.environ.get('MAZE_WORKERS', str(min(os.cpu_count() or 1, 4))))
+
+# Candidates explore a wider loop range than the default 25-40%
+# so the search has easier and harder mazes to choose from
+CANDIDATE_REMOVAL_RATES = (0.1, 0.5)
+
+_executor: Optional[ProcessPoolExecutor] = None
+# New games start on many threads at once (gthread workers, gevent's pool)
+_executor_lock = threading.Lock()
+
+
+def maze_metrics(maze: List[List[str]]) -> Dict[str, float]:
+    """
+    Score a maze layout cheaply in O(rows * cols).
+    One scan counts open cells, dead ends and junctions, one BFS from the
+    start measures food spread, and dead-end corridors are walked once to
+    estimate the collector path length (every dead end must be entered and
+    backtracked out of, so its corridor is walked twice).
+    """
+    rows = len(maze)
+    cols = len(maze[0]) if rows > 0 else 0
+    directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+
+    def open_neighbours(x: int, y: int) -> List[Tuple[int, int]]:
+        result = []
+        for dx, dy in directions:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < cols and 0 <= ny < rows and maze[ny][nx] != '#':
+                result.append((nx, ny))
+        return result
+
+    open_cells = 0
+    degree_sum = 0
+    dead_ends = []
+    junctions = 0
+    for y in range(rows):
+        for x in range(cols):
+            if maze[y][x] == '#':
+                continue
+            degree = len(open_neighbours(x, y))
+            open_cells += 1
+            degree_sum += degree
+            if degree == 1:
+                dead_ends.append((x, y))
+            elif degree >= 3:
+                junctions += 1
+
+    if open_cells == 0:
+        return {
+            'open_cells': 0, 'dead_ends': 0, 'junctions': 0,
+            'branching_factor': 0.0, 'collector_estimate': 0,
+            'food_spread': 0.0, 'goal_distance': 0
+        }
+
+    # Backtracking cost: length of each corridor leading into a dead end
+    backtrack = 0
+    for cell in dead_ends:
+        previous, current = None, cell
+        while True:
+            neighbours = [n for n in open_neighbours(*current) if n != previous]
+            if len(neighbours) != 1 or len(open_neighbours(*current)) > 2:
+                break
+            backtrack += 1
+            previous, current = current, neighbours[0]
+
+    # Food spread: mean BFS distance of every food cell from the start
+    distance_sum = 0
+    goal_distance = 0
+    goal = (cols - 1, rows - 1)
+    visited = {(0, 0): 0}
+    queue = deque([(0, 0)])
+    while queue:
+        cell = queue.popleft()
+        d = visited[cell]
+        distance_sum += d
+        if cell == goal:
+            goal_distance = d
+        for n in open_neighbours(*cell):
+            if n not in visited:
+                visited[n] = d + 1
+                queue.append(n)
+
+    return {
+        'open_cells': open_cells,
+        'dead_ends': len(dead_ends),
+        'junctions': junctions,
+        'branching_factor': degree_sum / open_cells,
+        'collector_estimate': open_cells + backtrack,
+        'food_spread': distance_sum / open_cells / (rows + cols),
+        'goal_distance': goal_distance
+    }
+
+
+def difficulty_score(metrics: Dict[str, float]) -> float:
+    """
+    Collapse maze metrics into a single difficulty value in [0, 1].
+    More dead ends, longer backtracking and wider food spread make a maze
+    harder; more junctions (loops to escape ghosts through) make it easier.
+    """
+    open_cells = metrics['open_cells']
+    if open_cells == 0:
+        return 0.0
+
+    dead_end_ratio = min(1.0, metrics['dead_ends'] / open_cells / 0.08)
+    detour_ratio = min(1.0, (metrics['collector_estimate'] / open_cells - 1) / 0.3)
+    openness = min(1.0, (metrics['branching_factor'] - 2) / 0.8)
+    spread = min(1.0, metrics['food_spread'])
+
+    score = (0.35 * dead_end_ratio + 0.35 * detour_ratio
+             + 0.15 * (1 - max(0.0, openness)) + 0.15 * spread)
+    return max(0.0, min(1.0, score))
+
+
+def difficulty_target(level: int) -> float:
+    """Target difficulty for a level - ramps from easy to hard over 10 levels."""
+    return round(min(0.7, 0.2 + (level - 1) * 0.055), 3)
+
+
+def _generate_candidate(args: Tuple[str, int, int, int, bool]) -> Tuple[List[List[str]], Dict[str, float], float, Optional[dict]]:
+    """
+    Generate and score one candidate maze (runs inside a worker process).
+    With `pooled` set, the worker's stage timings are returned so the
+    parent can merge them into its own report.
+    """
+    generator, rows, cols, seed, pooled = args
+    rng = random.Random(seed)
+    removal_rate = rng.uniform(*CANDIDATE_REMOVAL_RATES)
+    with profiling.span(f'generate.{generator}'):
+        maze = generate_maze(generator, rows, cols, rng=rng, removal_rate=removal_rate)
+    with profiling.span('maze.metrics'):
+        metrics = maze_metrics(maze)
+    stages = profiling.drain() if pooled and profiling.PROFILE_STAGES else None
+    return maze, metrics, difficulty_score(metrics), stages
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    """Lazily start the candidate pool (per worker process, after any fork)."""
+    global _executor
+    if MAZE_WORKERS <= 1 or under_gevent():
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=MAZE_WORKERS)
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the candidate pool and its processes (e.g. when a server worker exits)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(cancel_futures=True)
+
+
+def generate_targeted_maze(rows: int, cols: int, target: float,
+                           candidates: int = MAZE_CANDIDATES,
+                           generator: str = DEFAULT_GENERATOR,
+                           rng: Optional[random.Random] = None,
+                           parallel: bool = True) -> Tuple[List[List[str]], Dict[str, float]]:
+    """
+    Generate `candidates` mazes in parallel and return the one whose
+    difficulty is closest to `target`, together with its metrics.
+    Falls back to in-process generation if the pool is unavailable.
+    Pass an `rng` for reproducible candidates, and `parallel=False` when
+    already running inside a worker process.
+    """
+    rng = rng or random
+    candidates = max(1, candidates)
+    seeds = [rng.getrandbits(64) for _ in range(candidates)]
+
+    executor = _get_executor() if parallel and candidates > 1 else None
+    results = None
+    if executor is not None:
+        try:
+            results = list(executor.map(_generate_candidate,
+                                        [(generator, rows, cols, seed, True) for seed in seeds]))
+            for result in results:
+                profiling.merge(result[3])
+        except Exception as e:
+            print(f"Candidate pool failed, generating in-process: {e}")
+    if results is None:
+        results = [_generate_candidate((generator, rows, cols, seed, False)) for seed in seeds]
+
+    maze, metrics, score, _ = min(results, key=lambda r: abs(r[2] - target))
+    metrics = dict(metrics, difficulty=round(score, 3), target=target)
+    return maze, metrics
@@ -1,24 +1,31 @@
 """Game state management and level generation"""
+import random
 import uuid
 from typing import Dict, List, Tuple, Optional
-from app.maze import (
-    generate_random_maze, 
+from maze_engine.generators import generate_maze, generator_for_level
+from maze_engine.maze import (
     create_maze_grid, 
     build_collector_path, 
     get_all_food_positions
 )
+from app.difficulty import MAZE_CANDIDATES, difficulty_target, generate_targeted_maze
+from app.chunks import CHUNK_SIZE
+from app.corpus import maze_corpus
+from app.ghosts import GhostSimulation, ghosts_for_level
+from app.profiling import span
+from app.session import GameSession
 
 # Active game sessions in memory (use Redis/database for production)
-game_sessions: Dict[str, dict] = {}
+game_sessions: Dict[str, GameSession] = {}
 
 # Leaderboard (use database for production)
 leaderboard: List[dict] = []
 
 
-def create_new_game(level: int = 1, rows: int = 15, cols: int = 15) -> dict:
+def create_new_game(level: int = 1, rows: int = 15, cols: int = 15) -> GameSession:
     """
     Create a new game session with specified difficulty.
-    Returns game state dictionary.
+    Returns the game session.
     """
     game_id = str(uuid.uuid4())
     
@@ -26,87 +33,207 @@ def create_new_game(level: int = 1, rows: int = 15, cols: int = 15) -> dict:
     actual_rows = min(rows + (level - 1) * 2, 25)
     actual_cols = min(cols + (level - 1) * 2, 25)
     
-    # Generate maze
-    maze_layout = generate_random_maze(actual_rows, actual_cols)
-    maze_grid = create_maze_grid(maze_layout)
-    
-    # Get food positions
-    food_positions = get_all_food_positions(maze_grid)
-    
-    # Calculate optimal path
     start_cell = (0, 0)
     goal_cell = (actual_cols - 1, actual_rows - 1)
-    optimal_path = build_collector_path(maze_grid, start_cell, food_positions, goal_cell)
+    generator = generator_for_level(level)
     
-    game_state = {
-        'id': game_id,
-        'level': level,
-        'rows': actual_rows,
-        'cols': actual_cols,
-        'maze_grid': maze_grid,
-        'start': start_cell,
-        'goal': goal_cell,
-        'food_positions': food_positions,
-        'optimal_path': optimal_path,
-        'foods_collected': 0,
-        'total_foods': len(food_positions),
-        'score': 0,
-        'status': 'active',  # active, completed, failed
-        'path_length': len(optimal_path)
+    # Take a pre-generated maze from the shared corpus when there is one
+    # for this level; its collector path is only stored as a length
+    with span('game.corpus'):
+        record = maze_corpus.random_record(level, actual_rows, actual_cols)
+    if record is not None:
+        maze_grid, path_length, difficulty = record
+        optimal_path = None
+    else:
+        # Generate maze - pick the best of several candidates for this level's
+        # difficulty target, or a single random maze when targeting is disabled
+        difficulty = None
+        with span('game.generate'):
+            if MAZE_CANDIDATES > 1:
+                maze_layout, maze_metrics = generate_targeted_maze(
+                    actual_rows, actual_cols, difficulty_target(level), generator=generator
+                )
+                difficulty = maze_metrics['difficulty']
+            else:
+                maze_layout = generate_maze(generator, actual_rows, actual_cols)
+        with span('maze.grid'):
+            maze_grid = create_maze_grid(maze_layout)
+        
+        # Get food positions
+        with span('maze.foods'):
+            food_positions = get_all_food_positions(maze_grid)
+        
+        # Calculate optimal path
+        with span('maze.collector_path'):
+            optimal_path = build_collector_path(maze_grid, start_cell, food_positions, goal_cell)
+        path_length = len(optimal_path)
+    
+    with span('game.session'):
+        game = GameSession.from_grid(game_id, level, maze_grid, goal_cell, path=optimal_path,
+                                     path_length=path_length, generator=generator,
+                                     difficulty=difficulty)
+    
+    game_sessions[game_id] = game
+    return game
+
+
+def create_endless_game(seed: Optional[int] = None) -> GameSession:
+    """
+    Create an endless-mode session.
+    The maze is never generated up front - chunks are generated on demand
+    from the session seed and kept in a small per-session LRU.
+    """
+    game_id = str(uuid.uuid4())
+    if seed is None:
+        seed = random.getrandbits(32)
+    
+    game = GameSession.endless(game_id, seed)
+    
+    game_sessions[game_id] = game
+    return game
+
+
+def get_game_chunk(game_id: str, cx: int, cy: int) -> dict:
+    """Get chunk (cx, cy) of an endless game."""
+    game = game_sessions.get(game_id)
+    if not game:
+        return {'error': 'Game not found'}
+    if game.mode != 'endless':
+        return {'error': 'Game is not in endless mode'}
+    
+    return {
+        'cx': cx,
+        'cy': cy,
+        'size': CHUNK_SIZE,
+        'maze_grid': game.chunks.get(cx, cy)
     }
+
+
+def tick_ghosts(game_id: str, player: Tuple[int, int]) -> dict:
+    """
+    Advance the server-side ghosts one tick for the player's current cell.
+    The simulation is created on the first tick of a session.
+    """
+    game = game_sessions.get(game_id)
+    if not game:
+        return {'error': 'Game not found'}
+    if game.mode == 'endless':
+        return {'error': 'Ghosts are not available in endless mode'}
     
-    game_sessions[game_id] = game_state
-    return game_state
+    if not game.is_open(*player):
+        return {'error': 'Invalid player position'}
+    
+    simulation = game.ghosts
+    if simulation is None:
+        simulation = GhostSimulation(game.maze_grid(), ghosts_for_level(game.level), game.start)
+        game.ghosts = simulation
+    
+    return {
+        'tick': simulation.tick_count + 1,
+        'ghosts': simulation.tick(player)
+    }
+
+
+def get_hint(game_id: str, cell: Tuple[int, int], target: str = 'food') -> dict:
+    """Next step from `cell` towards the nearest remaining food or the goal."""
+    game = game_sessions.get(game_id)
+    if not game:
+        return {'error': 'Game not found'}
+    if game.mode == 'endless':
+        return {'error': 'Hints are not available in endless mode'}
+    
+    hint = game.navigation_index().hint(cell, target)
+    if hint is None:
+        return {'error': 'No hint available from this position'}
+    return hint
+
 
+def get_game_render(game_id: str) -> dict:
+    """Maze and collector path of a game, for rendering it to video."""
+    game = game_sessions.get(game_id)
+    if not game:
+        return {'error': 'Game not found'}
+    if game.mode == 'endless':
+        return {'error': 'Endless games cannot be rendered'}
+    return game.render_dict()
 
-def get_game_state(game_id: str) -> Optional[dict]:
+
+def get_game_state(game_id: str) -> Optional[GameSession]:
     """Retrieve game state by ID."""
     return game_sessions.get(game_id)
 
 
-def update_game_progress(game_id: str, foods_collected: int, time_elapsed: float) -> dict:
+def compute_score(foods_collected: int, time_elapsed: float, level: int) -> int:
+    """Score for a game: 100 per food plus a speed bonus, times the level."""
+    base_score = foods_collected * 100
+    time_bonus = max(0, 10000 - int(time_elapsed * 10))  # Bonus for speed
+    level_multiplier = level
+    
+    return (base_score + time_bonus) * level_multiplier
+
+
+def update_game_progress(game_id: str, foods_collected: int, time_elapsed: float,
+                         eaten: Optional[List[Tuple[int, int]]] = None,
+                         moves: Optional[str] = None) -> dict:
     """
     Update game progress and calculate score.
     Score based on: foods collected, time, and efficiency.
+    `eaten` lists food cells eaten since the last update, for hints, and
+    `moves` the player's steps since then ("URDL..."), for the replay.
+    Returns the progress response.
     """
     game = game_sessions.get(game_id)
     if not game:
         return {'error': 'Game not found'}
     
-    game['foods_collected'] = foods_collected
+    game.foods_collected = foods_collected
     
-    # Calculate score
-    base_score = foods_collected * 100
-    time_bonus = max(0, 10000 - int(time_elapsed * 10))  # Bonus for speed
-    level_multiplier = game['level']
+    if game.mode != 'endless':
+        for cell in eaten or []:
+            game.eat(cell)
+        if moves:
+            game.record_moves(moves)
     
-    game['score'] = (base_score + time_bonus) * level_multiplier
+    game.score = compute_score(foods_collected, time_elapsed, game.level)
     
-    # Check if game is complete
-    if foods_collected >= game['total_foods']:
-        game['status'] = 'completed'
+    # Check if game is complete (endless games never run out of food)
+    if game.total_foods is not None and foods_collected >= game.total_foods:
+        game.status = 'completed'
     
-    return game
+    return game.progress_dict()
 
 
-def complete_game(game_id: str, player_name: str, time_elapsed: float) -> dict:
+def complete_game(game_id: str, player_name: str, time_elapsed: float,
+                  moves: Optional[str] = None) -> dict:
     """
     Mark game as completed and add to leaderboard.
+    `moves` are any last steps not yet reported with progress.
+    Returns the completion response, with the packed replay (or None).
     """
     game = game_sessions.get(game_id)
     if not game:
         return {'error': 'Game not found'}
+    # A game is saved once; a repeated completion would queue a duplicate
+    # score and replay
+    if game.completion_time is not None:
+        return {'error': 'Game already completed'}
+    
+    game.status = 'completed'
+    game.completion_time = time_elapsed or 0
+    if moves:
+        game.record_moves(moves)
     
-    game['status'] = 'completed'
-    game['completion_time'] = time_elapsed
+    # Finished games no longer need hints or ghosts
+    game.navigation = None
+    game.ghosts = None
     
     # Add to leaderboard
     leaderboard_entry = {
         'player_name': player_name,
-        'score': game['score'],
-        'level': game['level'],
+        'score': game.score,
+        'level': game.level,
         'time': time_elapsed,
-        'foods_collected': game['foods_collected']
+        'foods_collected': game.foods_collected
     }
     
     leaderboard.append(leaderboard_entry)
@@ -116,7 +243,15 @@ def complete_game(game_id: str, player_name: str, time_elapsed: float) -> dict:
     if len(leaderboard) > 100:
         leaderboard.pop()
     
-    return game
+    return {
+        'id': game.id,
+        'level': game.level,
+        'mode': game.mode,
+        'score': game.score,
+        'status': game.status,
+        'completion_time': game.completion_time,
+        'replay': game.replay_data()
+    }
 
 
 def get_leaderboard(limit: int = 10) -> List[dict]:
@@ -138,5 +273,7 @@ def get_level_config(level: int) -> dict:
         'level': level,
         'rows': size,
         'cols': size,
+        'difficulty': difficulty_target(level),
+        'generator': generator_for_level(level),
         'description': f'Level {level} - {size}x{size} maze'
     }
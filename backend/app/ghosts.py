@@ -0,0 +1,164 @@
+"""Server-side ghost simulation driven by a shared distance field"""
+import random
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from maze_engine.maze import UNREACHED, MazeGraph
+
+# Mirrors GHOST_CONFIGS in frontend/src/types/extended.ts
+GHOST_CONFIGS = {
+    'chaser': {'speed': 1.0, 'aggro_range': 15},
+    'patrol': {'speed': 0.7, 'aggro_range': 5},
+    'random': {'speed': 0.8, 'aggro_range': 3},
+    'smart': {'speed': 0.9, 'aggro_range': 12},
+    'ambush': {'speed': 1.2, 'aggro_range': 4},
+}
+
+# Distance fields kept per session, keyed by player cell, so a player
+# stepping back and forth does not trigger a new search
+FIELD_CACHE_SIZE = 8
+
+
+class DistanceField:
+    """
+    Distance-to-player field shared by every ghost in a session.
+    Recomputed at most once per player cell and only out to the largest
+    aggro range - ghosts further away wander without reading it.
+    """
+
+    def __init__(self, graph: MazeGraph, max_depth: Optional[int] = None,
+                 cache_size: int = FIELD_CACHE_SIZE):
+        self.graph = graph
+        self.max_depth = max_depth
+        self.cache_size = cache_size
+        self.fields: 'OrderedDict[int, array]' = OrderedDict()
+
+    def get(self, player: int) -> array:
+        field = self.fields.get(player)
+        if field is not None:
+            self.fields.move_to_end(player)
+            return field
+
+        field = self.graph.distances(player, self.max_depth)
+        self.fields[player] = field
+        if len(self.fields) > self.cache_size:
+            self.fields.popitem(last=False)
+        return field
+
+
+def ghosts_for_level(level: int) -> List[str]:
+    """Ghost types spawned on a level (follows LEVEL_DEFINITIONS on the frontend)."""
+    if level <= 1:
+        types, count = ['random'], 1
+    elif level == 2:
+        types, count = ['random'], 2
+    elif level == 3:
+        types, count = ['random', 'patrol'], 2
+    elif level <= 5:
+        types, count = ['patrol', 'chaser'], 3
+    elif level == 6:
+        types, count = ['random', 'patrol', 'chaser'], 4
+    elif level == 7:
+        types, count = ['patrol', 'chaser', 'smart'], 4
+    elif level == 8:
+        types, count = ['chaser', 'smart'], 5
+    else:
+        types, count = ['chaser', 'smart', 'ambush'], min(5 + (level - 9) // 2, 14)
+    return [types[i % len(types)] for i in range(count)]
+
+
+class GhostSimulation:
+    """
+    Steps every ghost in a session once per tick.
+    One distance field from the player is shared by all ghosts, so each
+    ghost only inspects its own neighbours - O(1) per ghost per tick.
+    """
+
+    def __init__(self, grid: Optional[List[List[str]]], ghost_types: List[str],
+                 start: Tuple[int, int] = (0, 0), rng: Optional[random.Random] = None,
+                 graph: Optional[MazeGraph] = None):
+        self.rng = rng or random.Random()
+        self.graph = graph or MazeGraph(grid)
+        max_range = max((GHOST_CONFIGS[t]['aggro_range'] for t in ghost_types), default=0)
+        self.field = DistanceField(self.graph, max_depth=max_range)
+        self.tick_count = 0
+        self.ghosts: List[Dict] = []
+
+        # Spawn in the far half of the maze, away from the player's start
+        from_start = self.graph.distances(self.graph.index(start))
+        reachable = [i for i, d in enumerate(from_start) if d != UNREACHED]
+        furthest = max((from_start[i] for i in reachable), default=0)
+        spawn_cells = [i for i in reachable if from_start[i] * 2 >= furthest] or reachable
+
+        for n, ghost_type in enumerate(ghost_types):
+            if not spawn_cells:
+                break
+            position = self.rng.choice(spawn_cells)
+            self.ghosts.append({
+                'id': f'ghost-{n}',
+                'type': ghost_type,
+                'pos': position,
+                'prev': position,
+                'credit': 0.0
+            })
+
+    def tick(self, player: Tuple[int, int]) -> List[Dict]:
+        """Advance every ghost by one tick towards or around the player."""
+        self.tick_count += 1
+        player_index = self.graph.index(player)
+        field = self.field.get(player_index)
+        occupied = {g['pos'] for g in self.ghosts}
+
+        for ghost in self.ghosts:
+            config = GHOST_CONFIGS[ghost['type']]
+            ghost['credit'] += config['speed']
+            while ghost['credit'] >= 1:
+                ghost['credit'] -= 1
+                occupied.discard(ghost['pos'])
+                step = self._steer(ghost, field, config['aggro_range'], occupied)
+                ghost['prev'], ghost['pos'] = ghost['pos'], step
+                occupied.add(step)
+
+        return self.positions()
+
+    def _steer(self, ghost: Dict, field: array, aggro_range: int, occupied: set) -> int:
+        position = ghost['pos']
+        options = self.graph.neighbours[position]
+        if not options:
+            return position
+
+        distance = field[position]
+        in_range = distance != UNREACHED and distance <= aggro_range
+        ghost_type = ghost['type']
+
+        if in_range:
+            closer = [n for n in options if field[n] != UNREACHED and field[n] < distance]
+            if ghost_type == 'smart':
+                # Take a different approach route than the other ghosts
+                free = [n for n in closer if n not in occupied]
+                closer = free or closer
+            if closer:
+                return self.rng.choice(closer)
+            return position
+
+        if ghost_type == 'ambush':
+            # Lie in wait at the post until the player comes close
+            return position
+
+        if ghost_type == 'patrol':
+            # Keep going along the corridor, turning only when it ends or forks
+            straight = 2 * position - ghost['prev']
+            if straight in options and len(options) <= 2:
+                return straight
+
+        # Wander without reversing unless at a dead end
+        forward = [n for n in options if n != ghost['prev']] or list(options)
+        return self.rng.choice(forward)
+
+    def positions(self) -> List[Dict]:
+        result = []
+        for ghost in self.ghosts:
+            x, y = self.graph.cell(ghost['pos'])
+            result.append({'id': ghost['id'], 'type': ghost['type'], 'x': x, 'y': y})
+        return result
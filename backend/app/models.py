@@ -1,4 +1,7 @@
 from datetime import datetime
+
+from sqlalchemy import inspect, text
+
 from . import db
 
 class Score(db.Model):
@@ -6,6 +9,8 @@ class Score(db.Model):
     player_name = db.Column(db.String(50), nullable=False)
     score = db.Column(db.Integer, nullable=False)
     level = db.Column(db.Integer, nullable=False)
+    # 'maze' or 'endless' (endless games are saved as level 1)
+    mode = db.Column(db.String(10), nullable=False, default='maze', server_default='maze')
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
     def to_dict(self):
@@ -14,5 +19,95 @@ class Score(db.Model):
             'player_name': self.player_name,
             'score': self.score,
             'level': self.level,
+            'mode': self.mode,
             'timestamp': self.timestamp.isoformat()
         }
+
+
+class LevelStats(db.Model):
+    """Running totals per level, updated with every saved score."""
+    level = db.Column(db.Integer, primary_key=True)
+    games = db.Column(db.Integer, nullable=False, default=0)
+    total_score = db.Column(db.BigInteger, nullable=False, default=0)
+    best_score = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'level': self.level,
+            'games': self.games,
+            'average_score': round(self.total_score / self.games, 1) if self.games else 0,
+            'best_score': self.best_score
+        }
+
+
+class DailyStats(db.Model):
+    """Games played and best score per UTC day."""
+    day = db.Column(db.Date, primary_key=True)
+    games = db.Column(db.Integer, nullable=False, default=0)
+    best_score = db.Column(db.Integer, nullable=False, default=0)
+    best_player = db.Column(db.String(50), nullable=False, default='')
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'games': self.games,
+            'best_score': self.best_score,
+            'best_player': self.best_player
+        }
+
+
+class PlayerStats(db.Model):
+    """Personal bests and totals per player name."""
+    player_name = db.Column(db.String(50), primary_key=True)
+    games = db.Column(db.Integer, nullable=False, default=0)
+    total_score = db.Column(db.BigInteger, nullable=False, default=0)
+    best_score = db.Column(db.Integer, nullable=False, default=0)
+    highest_level = db.Column(db.Integer, nullable=False, default=0)
+    last_played = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'player_name': self.player_name,
+            'games': self.games,
+            'average_score': round(self.total_score / self.games, 1) if self.games else 0,
+            'best_score': self.best_score,
+            'highest_level': self.highest_level,
+            'last_played': self.last_played.isoformat() if self.last_played else None
+        }
+
+
+class Replay(db.Model):
+    """Packed grid and run-length moves of a finished game (format in app/replay.py)."""
+    id = db.Column(db.Integer, primary_key=True)
+    score_id = db.Column(db.Integer, db.ForeignKey('score.id'), unique=True)
+    game_id = db.Column(db.String(36), unique=True, nullable=False)
+    time_elapsed = db.Column(db.Float, nullable=False, default=0)
+    data = db.Column(db.LargeBinary, nullable=False)
+    score = db.relationship('Score', lazy='joined')
+
+    def to_dict(self):
+        return {
+            'game_id': self.game_id,
+            'player_name': self.score.player_name if self.score else None,
+            'score': self.score.score if self.score else None,
+            'level': self.score.level if self.score else None,
+            'timestamp': self.score.timestamp.isoformat() if self.score else None,
+            'time_elapsed': self.time_elapsed,
+            'bytes': len(self.data)
+        }
+
+
+def add_missing_columns():
+    """
+    create_all() only creates missing tables; add the columns introduced
+    since to a database created by an older version.
+    """
+    columns = {c['name'] for c in inspect(db.engine).get_columns('score')}
+    if 'mode' in columns:
+        return
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE score ADD COLUMN mode VARCHAR(10) NOT NULL DEFAULT 'maze'"))
+    except Exception as e:
+        # Another worker starting at the same time may have added it first
+        print(f"Could not add score.mode: {e}")
@@ -0,0 +1,211 @@
+"""Precomputed per-maze navigation index for hint queries"""
+import heapq
+from array import array
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from maze_engine.maze import UNREACHED, MazeGraph
+
+# Next-hop value for cells with no way forward
+NO_HOP = 0xFFFF
+
+# Exit bitmask -> open directions, in MazeGraph's (up, right, down, left) order
+_EXIT_DIRECTIONS = [tuple(d for d in range(4) if mask & (1 << d)) for mask in range(16)]
+
+
+@lru_cache(maxsize=None)
+def _exit_offsets(cols: int) -> Tuple[Tuple[int, ...], ...]:
+    """Exit bitmask -> index offsets of the open neighbours, shared by mazes of a width."""
+    offsets = (-cols, 1, cols, -1)
+    return tuple(tuple(offsets[d] for d in directions) for directions in _EXIT_DIRECTIONS)
+
+
+class NavigationIndex:
+    """
+    Built once per maze: dead-end flags, corridor segments and next-hop
+    tables towards the goal and towards the nearest remaining food. Eating a food only repairs the cells that were
+    closest to it, so hint lookups stay O(1).
+    Every table is a flat array over rows * cols cells, adjacency included
+    (one exit bitmask byte per cell), so an index held by a session is
+    about 11 KB for a 25x25 maze. The MazeGraph it is built from is
+    dropped after construction.
+    """
+
+    def __init__(self, grid: List[List[str]], goal: Tuple[int, int],
+                 foods: Iterable[Tuple[int, int]]):
+        graph = MazeGraph(grid)
+        self.rows, self.cols = graph.rows, graph.cols
+        size = graph.rows * graph.cols
+        if size >= NO_HOP:
+            raise ValueError(f"Maze too large to index ({size} cells)")
+        neighbours = graph.neighbours
+
+        offsets = (-self.cols, 1, self.cols, -1)
+        self.exits = bytearray(size)
+        for v, adjacent in enumerate(neighbours):
+            for w in adjacent:
+                self.exits[v] |= 1 << offsets.index(w - v)
+        self.exit_offsets = _exit_offsets(self.cols)
+
+        # Dead ends and corridor segments (runs of cells with exactly two exits)
+        self.dead_end = bytearray(1 if len(n) == 1 else 0 for n in neighbours)
+        self.segment = array('H', [0]) * size
+        self.segment_lengths = array('H', [0])
+        self._build_segments(neighbours)
+
+        # Next hop towards the goal never changes
+        self.goal_dist, self.goal_hop = self._bfs(neighbours, [graph.index(goal)])
+
+        # Next hop towards the nearest food, plus which food that is
+        self.food = bytearray(size)
+        sources = []
+        for cell in foods:
+            i = graph.index(cell)
+            if neighbours[i]:
+                self.food[i] = 1
+                sources.append(i)
+        self.food_dist, self.food_hop, self.food_owner = self._bfs(neighbours, sources, track_owner=True)
+
+    def neighbours(self, v: int) -> List[int]:
+        return [v + offset for offset in self.exit_offsets[self.exits[v]]]
+
+    def index(self, cell: Tuple[int, int]) -> int:
+        return cell[1] * self.cols + cell[0]
+
+    def cell(self, index: int) -> Tuple[int, int]:
+        y, x = divmod(index, self.cols)
+        return (x, y)
+
+    def _build_segments(self, neighbours: List[Tuple[int, ...]]):
+        """
+        Label every corridor cell with its segment, walking each corridor
+        out from the junction or dead end at either end of it.
+        """
+        nodes = [i for i, n in enumerate(neighbours) if n and len(n) != 2]
+
+        for node in nodes:
+            for step in neighbours[node]:
+                previous, current = node, step
+                seg_id = 0
+                while len(neighbours[current]) == 2:
+                    if seg_id == 0:
+                        seg_id = self.segment[current]
+                        if seg_id == 0:
+                            self.segment_lengths.append(0)
+                            seg_id = len(self.segment_lengths) - 1
+                    if self.segment[current] == 0:
+                        self.segment[current] = seg_id
+                        self.segment_lengths[seg_id] += 1
+                    a, b = neighbours[current]
+                    previous, current = current, (b if a == previous else a)
+                    if current == node:
+                        break
+
+    def _bfs(self, neighbours: List[Tuple[int, ...]], sources: List[int], track_owner: bool = False):
+        """Multi-source BFS returning distance and next-hop tables."""
+        size = self.rows * self.cols
+        dist = array('h', [UNREACHED]) * size
+        hop = array('H', [NO_HOP]) * size
+        owner = array('H', [NO_HOP]) * size if track_owner else None
+
+        frontier = []
+        for s in sources:
+            dist[s] = 0
+            if track_owner:
+                owner[s] = s
+            frontier.append(s)
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for v in frontier:
+                for w in neighbours[v]:
+                    if dist[w] == UNREACHED:
+                        dist[w] = depth
+                        hop[w] = v
+                        if track_owner:
+                            owner[w] = owner[v]
+                        next_frontier.append(w)
+            frontier = next_frontier
+
+        if track_owner:
+            return dist, hop, owner
+        return dist, hop
+
+    def mark_eaten(self, cell: Tuple[int, int]) -> bool:
+        """
+        Remove a food and repair the nearest-food tables.
+        Only the cells whose nearest food it was are touched: they are
+        re-seeded from their untouched neighbours and settled in order of
+        distance. Returns False if the cell held no food.
+        """
+        if not (0 <= cell[0] < self.cols and 0 <= cell[1] < self.rows):
+            return False
+        eaten = self.index(cell)
+        if not self.food[eaten]:
+            return False
+        self.food[eaten] = 0
+
+        neighbours = self.neighbours
+        dist, hop, owner = self.food_dist, self.food_hop, self.food_owner
+
+        # Collect the eaten food's region (connected through its own cells)
+        region = [eaten]
+        owner[eaten] = NO_HOP
+        for v in region:
+            for w in neighbours(v):
+                if owner[w] == eaten:
+                    owner[w] = NO_HOP
+                    region.append(w)
+        for v in region:
+            dist[v] = UNREACHED
+            hop[v] = NO_HOP
+
+        # Re-seed from the region boundary, then settle in distance order
+        heap = []
+        for v in region:
+            for w in neighbours(v):
+                if owner[w] != NO_HOP:
+                    heapq.heappush(heap, (dist[w] + 1, v, w))
+        while heap:
+            d, v, via = heapq.heappop(heap)
+            if dist[v] != UNREACHED:
+                continue
+            dist[v] = d
+            hop[v] = via
+            owner[v] = owner[via]
+            for w in neighbours(v):
+                if dist[w] == UNREACHED and owner[w] == NO_HOP:
+                    heapq.heappush(heap, (d + 1, w, v))
+        return True
+
+    def hint(self, cell: Tuple[int, int], target: str = 'food') -> Optional[dict]:
+        """
+        Next step from `cell` towards the nearest remaining food or the goal.
+        Returns None if the cell is a wall or the target is unreachable.
+        """
+        if not (0 <= cell[0] < self.cols and 0 <= cell[1] < self.rows):
+            return None
+        i = self.index(cell)
+        if not self.exits[i]:
+            return None
+
+        if target == 'goal':
+            dist, hop, destination = self.goal_dist, self.goal_hop, None
+        else:
+            dist, hop = self.food_dist, self.food_hop
+            destination = self.food_owner[i]
+        if dist[i] == UNREACHED:
+            return None
+
+        step = i if dist[i] == 0 else hop[i]
+        result = {
+            'target': target,
+            'next': self.cell(step),
+            'distance': dist[i],
+            'dead_end': bool(self.dead_end[step]),
+            'corridor': self.segment_lengths[self.segment[step]]
+        }
+        if destination is not None and destination != NO_HOP:
+            result['food'] = self.cell(destination)
+        return result
@@ -0,0 +1,229 @@
+"""Low-overhead stage timing and sampled request profiling"""
+import contextlib
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from maze_engine import stages as engine_stages
+
+# Set PROFILE_STAGES=1 to time every pipeline stage wrapped in span()
+PROFILE_STAGES = os.environ.get('PROFILE_STAGES', '0') == '1'
+
+# Share of requests run under cProfile (0 disables it)
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+
+# Sampled requests slower than this are dumped as .prof files
+PROFILE_SLOW_MS = float(os.environ.get('PROFILE_SLOW_MS', '200'))
+
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'tigerworld_profiles'))
+
+# Oldest dumps are deleted beyond this many
+PROFILE_MAX_DUMPS = int(os.environ.get('PROFILE_MAX_DUMPS', '20'))
+
+# Token required by the admin endpoints (unset disables them)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+# stage -> [count, total ns, max ns]
+_stages: Dict[str, List[int]] = {}
+_lock = threading.Lock()
+_noop = contextlib.nullcontext()
+
+
+def _reset_after_fork():
+    # A forked child (candidate pool, gunicorn worker) starts with empty
+    # totals, so merged worker timings are not counted twice
+    global _stages, _lock
+    _stages = {}
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter_ns() - self.start)
+
+
+def span(name: str):
+    """
+    Time a block as stage `name`:
+        with span('maze.carve'):
+            ...
+    A shared no-op context when PROFILE_STAGES is off.
+    """
+    return _Span(name) if PROFILE_STAGES else _noop
+
+
+# Engine stages (maze.carve, maze.grid, ...) report through the same totals
+engine_stages.set_span_factory(span)
+
+
+def record(name: str, elapsed_ns: int, count: int = 1):
+    with _lock:
+        entry = _stages.get(name)
+        if entry is None:
+            _stages[name] = [count, elapsed_ns, elapsed_ns]
+        else:
+            entry[0] += count
+            entry[1] += elapsed_ns
+            entry[2] = max(entry[2], elapsed_ns)
+
+
+def drain() -> Dict[str, List[int]]:
+    """Take and reset this process's stage totals (to ship them to another process)."""
+    global _stages
+    with _lock:
+        stages, _stages = _stages, {}
+    return stages
+
+
+def merge(stages: Optional[Dict[str, List[int]]]):
+    """Add stage totals drained from a worker process."""
+    if not stages:
+        return
+    with _lock:
+        for name, (count, total, longest) in stages.items():
+            entry = _stages.get(name)
+            if entry is None:
+                _stages[name] = [count, total, longest]
+            else:
+                entry[0] += count
+                entry[1] += total
+                entry[2] = max(entry[2], longest)
+
+
+def report(reset: bool = False) -> dict:
+    """Per-stage totals, slowest total first, plus the saved profile dumps."""
+    with _lock:
+        stages = {name: list(entry) for name, entry in _stages.items()}
+        if reset:
+            _stages.clear()
+    rows = [{
+        'stage': name,
+        'count': count,
+        'total_ms': round(total / 1e6, 3),
+        'mean_ms': round(total / count / 1e6, 4),
+        'max_ms': round(longest / 1e6, 3)
+    } for name, (count, total, longest) in stages.items()]
+    rows.sort(key=lambda r: r['total_ms'], reverse=True)
+    return {
+        'enabled': PROFILE_STAGES,
+        'pid': os.getpid(),
+        'stages': rows,
+        'dumps': _list_dumps()
+    }
+
+
+def check_admin_token(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and hmac.compare_digest((token or '').encode(), ADMIN_TOKEN.encode())
+
+
+def _list_dumps() -> List[str]:
+    try:
+        return sorted(f for f in os.listdir(PROFILE_DIR) if f.endswith('.prof'))
+    except OSError:
+        return []
+
+
+def profile_offloaded(func):
+    """
+    Wrap `func` to run under its own cProfile when the current request is
+    sampled and `func` is about to run on another thread, which the
+    request's profiler does not see. Its stats are added to the request's
+    dump.
+    """
+    from flask import g, has_request_context
+
+    if not has_request_context() or not g.get('profile_sampled'):
+        return func
+    profiles = g.setdefault('offloaded_profiles', [])
+
+    def wrapper(*args, **kwargs):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            profiles.append(profiler)
+    return wrapper
+
+
+def _start_request():
+    from flask import g
+
+    from app.concurrency import under_gevent
+
+    g.profile_start = time.perf_counter_ns()
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        if under_gevent():
+            # Every greenlet runs on the hub thread, so a profiler enabled
+            # here would record the other requests too; only the work the
+            # request offloads to native threads is profiled
+            g.profile_sampled = True
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return
+        g.profiler = profiler
+        g.profile_sampled = True
+
+
+def _finish_request(response):
+    from flask import g, request
+
+    start = g.pop('profile_start', None)
+    profiler = g.pop('profiler', None)
+    offloaded = g.pop('offloaded_profiles', [])
+    g.pop('profile_sampled', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter_ns() - start
+    if PROFILE_STAGES:
+        record(f'request.{request.endpoint}', elapsed)
+
+    if profiler is not None:
+        profiler.disable()
+    if (profiler is not None or offloaded) and elapsed / 1e6 >= PROFILE_SLOW_MS:
+        _dump(profiler, offloaded, elapsed)
+    return response
+
+
+def _dump(profiler: Optional[cProfile.Profile], offloaded: List[cProfile.Profile], elapsed_ns: int):
+    from flask import request
+
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = (f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{request.endpoint}"
+                f"_{elapsed_ns // 1_000_000}ms.prof")
+        profiles = ([profiler] if profiler is not None else []) + offloaded
+        pstats.Stats(*profiles).dump_stats(os.path.join(PROFILE_DIR, name))
+        for old in _list_dumps()[:-PROFILE_MAX_DUMPS]:
+            os.remove(os.path.join(PROFILE_DIR, old))
+    except OSError as e:
+        print(f"Error saving profile: {e}")
+
+
+def init_app(app):
+    if PROFILE_STAGES or PROFILE_SAMPLE_RATE > 0:
+        app.before_request(_start_request)
+        app.after_request(_finish_request)
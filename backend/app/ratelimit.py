@@ -0,0 +1,197 @@
+"""Token-bucket rate limiting and admission control for expensive endpoints"""
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Optional, Tuple
+
+from flask import g, jsonify, request
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from app.concurrency import run_cpu_bound
+
+# Set RATE_LIMIT_ENABLED=0 to turn every check off
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') != '0'
+
+# Buckets live in a local SQLite file so every worker on the host shares them
+RATE_LIMIT_DB = os.environ.get('RATE_LIMIT_DB',
+                               os.path.join(tempfile.gettempdir(), 'tigerworld_ratelimit.db'))
+
+# Tokens per second and bucket size, per client and for the whole server
+CLIENT_RATE = float(os.environ.get('RATE_LIMIT_CLIENT_RATE', '2'))
+CLIENT_BURST = float(os.environ.get('RATE_LIMIT_CLIENT_BURST', '20'))
+GLOBAL_RATE = float(os.environ.get('RATE_LIMIT_GLOBAL_RATE', '50'))
+GLOBAL_BURST = float(os.environ.get('RATE_LIMIT_GLOBAL_BURST', '200'))
+
+# Behind one trusted proxy: use the X-Forwarded-For address that proxy
+# appended (the rightmost), not the client-supplied ones before it
+RATE_LIMIT_TRUST_PROXY = os.environ.get('RATE_LIMIT_TRUST_PROXY', '0') == '1'
+
+# Maze generations allowed to run at once in each worker process
+GENERATION_SLOTS = int(os.environ.get('GENERATION_SLOTS', '2'))
+
+# Token cost per endpoint; endpoints not listed are never limited
+ENDPOINT_COSTS = {
+    'api.new_game': 2.0,
+    'api.finish_game': 1.0,
+    'api.get_leaderboard_list': 1.0,
+    'api.get_level_stats': 0.5,
+    'api.get_daily_stats': 0.5,
+    'api.get_player_stats_list': 0.5,
+    'api.get_player_stats': 0.5,
+    'api.get_replay_list': 0.5,
+    'api.get_replay': 1.0,
+}
+
+# Buckets idle this long are full again and can be dropped
+IDLE_SECONDS = 3600
+
+# One connection per thread; under gevent the store is only used from the
+# hub's native thread pool (see check_request), not from request greenlets
+_local = threading.local()
+_generation_slots = threading.BoundedSemaphore(max(1, GENERATION_SLOTS))
+_last_cleanup = 0.0
+
+
+class BucketStore:
+    """
+    Token buckets in a shared SQLite file.
+    Each check refills and debits the client and global buckets in one
+    write transaction, so concurrent workers see a consistent balance.
+    """
+
+    def __init__(self, path: str = RATE_LIMIT_DB):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(_local, 'conn', None)
+        if conn is None or getattr(_local, 'path', None) != self.path:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute('CREATE TABLE IF NOT EXISTS buckets '
+                         '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+            _local.conn, _local.path = conn, self.path
+        return conn
+
+    def take(self, cost: float, buckets: Tuple[Tuple[str, float, float], ...]) -> float:
+        """
+        Debit `cost` from every (key, rate, burst) bucket, or from none.
+        Returns 0 on success, otherwise seconds until the request would fit.
+        """
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        now = time.time()
+        try:
+            balances = []
+            wait = 0.0
+            for key, rate, burst in buckets:
+                row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+                tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+                if tokens < cost:
+                    wait = max(wait, (cost - tokens) / rate if rate > 0 else math.inf)
+                balances.append((key, tokens))
+            if wait == 0.0:
+                conn.executemany('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                                 [(key, tokens - cost, now) for key, tokens in balances])
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+    def cleanup(self, idle_seconds: float = IDLE_SECONDS):
+        """Drop buckets that have been idle long enough to be full again."""
+        conn = self._connect()
+        conn.execute('DELETE FROM buckets WHERE updated < ?', (time.time() - idle_seconds,))
+
+
+store = BucketStore()
+
+
+def client_id() -> str:
+    # With RATE_LIMIT_TRUST_PROXY, ProxyFix has already set this from X-Forwarded-For
+    return request.remote_addr or 'unknown'
+
+
+def request_cost() -> Tuple[float, bool]:
+    """
+    Token cost of the current request and whether it generates a maze.
+    New games cost more the larger the level's maze.
+    """
+    if request.method == 'OPTIONS':
+        return 0.0, False
+    cost = ENDPOINT_COSTS.get(request.endpoint or '', 0.0)
+    if request.endpoint != 'api.new_game':
+        return cost, False
+
+    data = request.get_json(silent=True) or {}
+    if data.get('mode') == 'endless':
+        return cost, False
+    level = data.get('level', 1)
+    if isinstance(level, int) and level > 1:
+        size = min(15 + (level - 1) * 2, 25)
+        cost *= size * size / 225
+    return cost, True
+
+
+def _shed(status: int, error: str, retry_after: Optional[float] = None):
+    response = jsonify({'error': error})
+    response.status_code = status
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def check_request():
+    """
+    before_request hook: reject new games with 503 while this worker's
+    generation slots are busy and over-limit requests with 429, before
+    any work is done. A rejected request still runs the teardown hook,
+    which frees its slot.
+    """
+    global _last_cleanup
+    cost, generates = request_cost()
+    if cost <= 0:
+        return None
+
+    # Check the local slots first so a shed request costs no tokens
+    if generates:
+        if not _generation_slots.acquire(blocking=False):
+            return _shed(503, 'Server busy, try again shortly', 1)
+        g.generation_slot = True
+
+    # Under gevent the write lock wait (up to the 1 s busy timeout) would
+    # block the whole worker, so the store runs on a native thread
+    try:
+        wait = run_cpu_bound(store.take, cost, (
+            (f'client:{client_id()}', CLIENT_RATE, CLIENT_BURST),
+            ('global', GLOBAL_RATE, GLOBAL_BURST),
+        ))
+        if time.monotonic() - _last_cleanup > IDLE_SECONDS:
+            _last_cleanup = time.monotonic()
+            run_cpu_bound(store.cleanup)
+    except sqlite3.Error as e:
+        # Fail open: a broken limiter must not take the API down
+        print(f"Rate limiter unavailable: {e}")
+        wait = 0.0
+    if wait > 0:
+        return _shed(429, 'Too many requests', wait)
+    return None
+
+
+def release_slot(exc=None):
+    """teardown_request hook: free the generation slot taken for this request."""
+    if g.pop('generation_slot', False):
+        _generation_slots.release()
+
+
+def init_app(app):
+    if RATE_LIMIT_TRUST_PROXY:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+    if not RATE_LIMIT_ENABLED:
+        return
+    app.before_request(check_request)
+    app.teardown_request(release_slot)
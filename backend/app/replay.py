@@ -0,0 +1,102 @@
+"""Compact binary replays of finished games"""
+import os
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+# Directions in move-byte order; a move byte is (direction << 6) | (run - 1)
+MOVE_DIRECTIONS = 'URDL'
+MOVE_DELTAS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+MAX_RUN = 64
+
+# Moves past this many bytes are not recorded (a 25x25 game is a few hundred)
+REPLAY_MAX_BYTES = int(os.environ.get('REPLAY_MAX_BYTES', '4096'))
+
+REPLAY_VERSION = 1
+
+# version, rows, cols, start cell index, goal cell index
+HEADER = struct.Struct('<BHHHH')
+
+# 2-bit grid codes
+GRID_EMPTY = 0
+GRID_FOOD = 1
+GRID_WALL = 3
+GRID_SYMBOLS = {GRID_EMPTY: ' ', GRID_FOOD: '.', GRID_WALL: '#'}
+
+# Packed grid byte -> its four cells as symbols (code 2 is unused, shown as wall)
+_BYTE_SYMBOLS = [''.join(GRID_SYMBOLS.get((b >> shift) & 3, '#') for shift in (0, 2, 4, 6))
+                 for b in range(256)]
+
+
+def append_move(moves: bytearray, direction: int):
+    """Add one step, extending the last run if it goes the same way."""
+    if moves:
+        last = moves[-1]
+        if last >> 6 == direction and (last & 0x3F) < MAX_RUN - 1:
+            moves[-1] = last + 1
+            return
+    moves.append(direction << 6)
+
+
+def iter_runs(moves: bytes) -> Iterator[Tuple[int, int]]:
+    """Yield (direction, run length) for each move byte."""
+    for b in moves:
+        yield b >> 6, (b & 0x3F) + 1
+
+
+def pack_grid(codes: List[int]) -> bytes:
+    """Four 2-bit cell codes per byte, first cell in the low bits."""
+    packed = bytearray((len(codes) + 3) // 4)
+    for i, code in enumerate(codes):
+        packed[i >> 2] |= code << ((i & 3) * 2)
+    return bytes(packed)
+
+
+def unpack_grid(packed: bytes, size: int) -> List[int]:
+    return [(packed[i >> 2] >> ((i & 3) * 2)) & 3 for i in range(size)]
+
+
+def encode_replay(rows: int, cols: int, start: int, goal: int,
+                  codes: List[int], moves: bytes) -> bytes:
+    """Header, then the packed grid, then the move bytes to the end."""
+    return HEADER.pack(REPLAY_VERSION, rows, cols, start, goal) + pack_grid(codes) + bytes(moves)
+
+
+def decode_replay(data: bytes) -> Tuple[dict, List[str], bytes]:
+    """
+    Split a replay into its header fields, the grid as strings ('#' wall,
+    '.' food, ' ' empty) and the raw move bytes.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError('Replay is truncated')
+    version, rows, cols, start, goal = HEADER.unpack_from(data)
+    if version != REPLAY_VERSION:
+        raise ValueError(f'Unsupported replay version {version}')
+    grid_bytes = (rows * cols + 3) // 4
+    if len(data) < HEADER.size + grid_bytes:
+        raise ValueError('Replay is truncated')
+    packed = data[HEADER.size:HEADER.size + grid_bytes]
+    cells = ''.join([_BYTE_SYMBOLS[b] for b in packed])
+    grid = [cells[y * cols:(y + 1) * cols] for y in range(rows)]
+    header = {
+        'rows': rows,
+        'cols': cols,
+        'start': (start % cols, start // cols),
+        'goal': (goal % cols, goal // cols)
+    }
+    return header, grid, data[HEADER.size + grid_bytes:]
+
+
+def replay_runs(header: dict, moves: bytes) -> Iterator[dict]:
+    """Each run of moves with the cell it ends on, for streaming playback."""
+    x, y = header['start']
+    for direction, run in iter_runs(moves):
+        dx, dy = MOVE_DELTAS[direction]
+        x, y = x + dx * run, y + dy * run
+        yield {'d': MOVE_DIRECTIONS[direction], 'n': run, 'to': [x, y]}
+
+
+def parse_moves(value) -> Optional[str]:
+    """Validate a moves string from a request ("URRDL..."), or None."""
+    if isinstance(value, str) and all(c in MOVE_DIRECTIONS for c in value):
+        return value
+    return None
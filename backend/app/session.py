@@ -0,0 +1,250 @@
+"""Compact in-memory game session"""
+from array import array
+from bisect import bisect_left
+from typing import List, Optional, Tuple
+
+from maze_engine.maze import FOOD_EMOJIS, build_collector_path
+from app.chunks import CHUNK_SIZE, ChunkCache
+from app.navigation import NavigationIndex
+from app.replay import (GRID_EMPTY, GRID_FOOD, GRID_WALL, MOVE_DELTAS, MOVE_DIRECTIONS,
+                        REPLAY_MAX_BYTES, append_move, encode_replay)
+
+# Grid byte values; any other byte is an index into FOOD_EMOJIS
+CELL_WALL = 0xFF
+CELL_EMPTY = 0xFE
+
+
+class GameSession:
+    """
+    One game held in `game_sessions`.
+    The grid is one byte per cell, foods and the collector path are flat
+    cell indices (y * cols + x) in array('H'), and eaten foods are a bitset
+    over the food array. The navigation index is only built the first time
+    a hint or ghost needs it, from the foods still left at that point.
+    Reported moves are kept as run-length move bytes (see app.replay).
+    """
+
+    __slots__ = (
+        'id', 'mode', 'level', 'rows', 'cols', 'generator', 'difficulty',
+        'grid', 'start', 'goal', 'foods', 'eaten', 'path', 'path_length',
+        'total_foods', 'foods_collected', 'score', 'status', 'completion_time',
+        'navigation', 'ghosts', 'seed', 'chunks', 'moves', 'position'
+    )
+
+    def __init__(self, game_id: str, mode: str = 'maze', level: int = 1):
+        self.id = game_id
+        self.mode = mode
+        self.level = level
+        self.rows = 0
+        self.cols = 0
+        self.generator = None
+        self.difficulty = None
+        self.grid = b''
+        self.start = (0, 0)
+        self.goal = (0, 0)
+        self.foods = array('H')
+        self.eaten = bytearray()
+        self.path = array('H')
+        self.path_length = 0
+        self.total_foods: Optional[int] = None
+        self.foods_collected = 0
+        self.score = 0
+        self.status = 'active'  # active, completed, failed
+        self.completion_time = None
+        self.navigation: Optional[NavigationIndex] = None
+        self.ghosts = None
+        self.seed = None
+        self.chunks: Optional[ChunkCache] = None
+        self.moves = bytearray()
+        self.position = 0
+
+    @classmethod
+    def from_grid(cls, game_id: str, level: int, maze_grid: List[List[str]],
+                  goal: Tuple[int, int], path: Optional[List[Tuple[int, int]]] = None,
+                  path_length: Optional[int] = None, generator: Optional[str] = None,
+                  difficulty: Optional[float] = None) -> 'GameSession':
+        """Pack an emoji grid and its collector path into a new session."""
+        session = cls(game_id, level=level)
+        session.rows = len(maze_grid)
+        session.cols = len(maze_grid[0]) if maze_grid else 0
+        session.goal = goal
+        session.generator = generator
+        session.difficulty = difficulty
+
+        grid = bytearray(session.rows * session.cols)
+        for i, cell in enumerate(c for row in maze_grid for c in row):
+            if cell == '#':
+                grid[i] = CELL_WALL
+            elif cell in FOOD_EMOJIS:
+                grid[i] = FOOD_EMOJIS.index(cell)
+                session.foods.append(i)
+            else:
+                grid[i] = CELL_EMPTY
+        session.grid = bytes(grid)
+        session.eaten = bytearray((len(session.foods) + 7) // 8)
+        session.total_foods = len(session.foods)
+
+        if path:
+            session.path = array('H', (y * session.cols + x for x, y in path))
+        session.path_length = len(session.path) if path_length is None else path_length
+        return session
+
+    @classmethod
+    def endless(cls, game_id: str, seed: int) -> 'GameSession':
+        """An endless-mode session; its chunks are generated on demand."""
+        session = cls(game_id, mode='endless')
+        session.seed = seed
+        session.chunks = ChunkCache(seed)
+        return session
+
+    def cell(self, index: int) -> Tuple[int, int]:
+        y, x = divmod(index, self.cols)
+        return (x, y)
+
+    def is_open(self, x: int, y: int) -> bool:
+        return 0 <= x < self.cols and 0 <= y < self.rows and self.grid[y * self.cols + x] != CELL_WALL
+
+    def maze_grid(self) -> List[List[str]]:
+        """The emoji grid as sent to clients (foods are shown as dealt)."""
+        symbols = {CELL_WALL: '#', CELL_EMPTY: ' '}
+        cells = [symbols.get(b) or FOOD_EMOJIS[b] for b in self.grid]
+        return [cells[y * self.cols:(y + 1) * self.cols] for y in range(self.rows)]
+
+    def food_positions(self, remaining: bool = False) -> List[Tuple[int, int]]:
+        return [self.cell(i) for n, i in enumerate(self.foods)
+                if not (remaining and self.eaten[n >> 3] & (1 << (n & 7)))]
+
+    def optimal_path(self) -> List[Tuple[int, int]]:
+        return [self.cell(i) for i in self.path]
+
+    def eat(self, cell: Tuple[int, int]) -> bool:
+        """Mark the food on `cell` as eaten. Returns False if there was none left."""
+        x, y = cell
+        if not self.is_open(x, y):
+            return False
+        index = y * self.cols + x
+        n = bisect_left(self.foods, index)
+        if n == len(self.foods) or self.foods[n] != index or self.eaten[n >> 3] & (1 << (n & 7)):
+            return False
+        self.eaten[n >> 3] |= 1 << (n & 7)
+        if self.navigation is not None:
+            self.navigation.mark_eaten(cell)
+        return True
+
+    def record_moves(self, moves: str) -> int:
+        """
+        Append moves ('U', 'R', 'D', 'L') to the replay from the last
+        recorded cell. Moves into walls or past REPLAY_MAX_BYTES are
+        dropped. Returns how many were recorded.
+        """
+        if self.mode == 'endless':
+            return 0
+        recorded = 0
+        x, y = self.cell(self.position)
+        for move in moves:
+            if len(self.moves) >= REPLAY_MAX_BYTES:
+                break
+            direction = MOVE_DIRECTIONS.find(move)
+            if direction < 0:
+                continue
+            dx, dy = MOVE_DELTAS[direction]
+            if not self.is_open(x + dx, y + dy):
+                continue
+            x, y = x + dx, y + dy
+            append_move(self.moves, direction)
+            recorded += 1
+        self.position = y * self.cols + x
+        return recorded
+
+    def replay_data(self) -> Optional[bytes]:
+        """The packed replay of this game, or None if no moves were reported."""
+        if self.mode == 'endless' or not self.moves:
+            return None
+        codes = [GRID_WALL if b == CELL_WALL else GRID_EMPTY if b == CELL_EMPTY else GRID_FOOD
+                 for b in self.grid]
+        start = self.start[1] * self.cols + self.start[0]
+        goal = self.goal[1] * self.cols + self.goal[0]
+        return encode_replay(self.rows, self.cols, start, goal, codes, self.moves)
+
+    def navigation_index(self) -> NavigationIndex:
+        """Build the hint index on first use, from the foods not eaten yet."""
+        if self.navigation is None:
+            self.navigation = NavigationIndex(self.maze_grid(), self.goal,
+                                              self.food_positions(remaining=True))
+        return self.navigation
+
+    def to_dict(self) -> dict:
+        """Response for a newly created game (never includes the solution)."""
+        if self.mode == 'endless':
+            return {
+                'id': self.id,
+                'mode': self.mode,
+                'seed': self.seed,
+                'chunk_size': CHUNK_SIZE,
+                'start': self.start,
+                'status': self.status
+            }
+        return {
+            'id': self.id,
+            'level': self.level,
+            'rows': self.rows,
+            'cols': self.cols,
+            'maze_grid': self.maze_grid(),
+            'start': self.start,
+            'goal': self.goal,
+            'total_foods': self.total_foods,
+            'status': self.status
+        }
+
+    def state_dict(self) -> dict:
+        """Response for the current game state."""
+        if self.mode == 'endless':
+            return {
+                'id': self.id,
+                'mode': self.mode,
+                'seed': self.seed,
+                'chunk_size': CHUNK_SIZE,
+                'foods_collected': self.foods_collected,
+                'score': self.score,
+                'status': self.status
+            }
+        return {
+            'id': self.id,
+            'level': self.level,
+            'rows': self.rows,
+            'cols': self.cols,
+            'maze_grid': self.maze_grid(),
+            'foods_collected': self.foods_collected,
+            'total_foods': self.total_foods,
+            'score': self.score,
+            'status': self.status
+        }
+
+    def render_dict(self) -> dict:
+        """
+        The maze and its collector path, as TigerWorld.py --session renders
+        them. Corpus games only keep the path length, so their path is
+        solved again here.
+        """
+        maze_grid = self.maze_grid()
+        path = self.optimal_path()
+        if not path:
+            path = build_collector_path(maze_grid, self.start, self.food_positions(), self.goal)
+        return {
+            'id': self.id,
+            'level': self.level,
+            'rows': self.rows,
+            'cols': self.cols,
+            'maze_grid': maze_grid,
+            'start': self.start,
+            'goal': self.goal,
+            'optimal_path': path
+        }
+
+    def progress_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'foods_collected': self.foods_collected,
+            'score': self.score,
+            'status': self.status
+        }
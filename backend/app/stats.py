@@ -0,0 +1,242 @@
+"""Incrementally maintained leaderboard aggregates"""
+import atexit
+import os
+import threading
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import case
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import DailyStats, LevelStats, PlayerStats, Replay, Score
+
+# Scores buffered per worker before they are written in one transaction
+# (1 writes every score and its aggregates in the request's own transaction)
+SCORE_BATCH_SIZE = int(os.environ.get('SCORE_BATCH_SIZE', '1'))
+
+# A partial batch is flushed by a timer once its oldest score has waited this long
+SCORE_FLUSH_SECONDS = float(os.environ.get('SCORE_FLUSH_SECONDS', '5'))
+
+# (player_name, score, level, timestamp, mode)
+ScoreRow = Tuple[str, int, int, datetime, str]
+
+# (game_id, time_elapsed, packed replay) saved with a score
+ReplayRow = Tuple[str, float, bytes]
+
+
+def aggregate(scores: Iterable[ScoreRow]) -> Tuple[Dict[int, list], Dict[date, list], Dict[str, list]]:
+    """
+    Fold scores into per-level, per-day and per-player deltas.
+    Scores are applied in order, so ties for a best score keep the first.
+    """
+    levels: Dict[int, list] = {}
+    days: Dict[date, list] = {}
+    players: Dict[str, list] = {}
+    for player_name, score, level, timestamp, _ in scores:
+        entry = levels.setdefault(level, [0, 0, score])
+        entry[0] += 1
+        entry[1] += score
+        entry[2] = max(entry[2], score)
+
+        entry = days.setdefault(timestamp.date(), [0, score, player_name])
+        entry[0] += 1
+        if score > entry[1]:
+            entry[1], entry[2] = score, player_name
+
+        entry = players.setdefault(player_name, [0, 0, score, level, timestamp])
+        entry[0] += 1
+        entry[1] += score
+        entry[2] = max(entry[2], score)
+        entry[3] = max(entry[3], level)
+        entry[4] = max(entry[4], timestamp)
+    return levels, days, players
+
+
+def _upsert(model, key: dict, increment: dict, insert: dict):
+    """
+    Apply one delta with a single UPDATE, inserting the row if it is new.
+    The UPDATE computes new values from the stored ones, so concurrent
+    workers never overwrite each other's totals.
+    """
+    query = db.session.query(model).filter_by(**key)
+    if query.update(increment, synchronize_session=False):
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(model(**key, **insert))
+    except IntegrityError:
+        # Another worker inserted the row first
+        query.update(increment, synchronize_session=False)
+
+
+def apply_scores(scores: List[ScoreRow], replays: Optional[List[Optional[ReplayRow]]] = None):
+    """
+    Add scores, their replays (matched by position, None for no replay)
+    and their aggregate deltas to the current transaction.
+    """
+    replays = replays or [None] * len(scores)
+    for (player_name, score, level, timestamp, mode), replay in zip(scores, replays):
+        row = Score(player_name=player_name, score=score, level=level, mode=mode, timestamp=timestamp)
+        db.session.add(row)
+        if replay is not None:
+            game_id, time_elapsed, data = replay
+            db.session.add(Replay(score=row, game_id=game_id, time_elapsed=time_elapsed, data=data))
+
+    levels, days, players = aggregate(scores)
+    for level, (games, total, best) in levels.items():
+        _upsert(LevelStats, {'level': level}, {
+            LevelStats.games: LevelStats.games + games,
+            LevelStats.total_score: LevelStats.total_score + total,
+            LevelStats.best_score: case((LevelStats.best_score < best, best), else_=LevelStats.best_score)
+        }, {'games': games, 'total_score': total, 'best_score': best})
+
+    for day, (games, best, best_player) in days.items():
+        # best_player comes first: every SET expression reads the old row
+        _upsert(DailyStats, {'day': day}, {
+            DailyStats.best_player: case((DailyStats.best_score < best, best_player),
+                                         else_=DailyStats.best_player),
+            DailyStats.best_score: case((DailyStats.best_score < best, best), else_=DailyStats.best_score),
+            DailyStats.games: DailyStats.games + games
+        }, {'games': games, 'best_score': best, 'best_player': best_player})
+
+    for player_name, (games, total, best, highest, last) in players.items():
+        _upsert(PlayerStats, {'player_name': player_name}, {
+            PlayerStats.games: PlayerStats.games + games,
+            PlayerStats.total_score: PlayerStats.total_score + total,
+            PlayerStats.best_score: case((PlayerStats.best_score < best, best), else_=PlayerStats.best_score),
+            PlayerStats.highest_level: case((PlayerStats.highest_level < highest, highest),
+                                            else_=PlayerStats.highest_level),
+            PlayerStats.last_played: case((PlayerStats.last_played < last, last),
+                                          else_=PlayerStats.last_played)
+        }, {'games': games, 'total_score': total, 'best_score': best,
+            'highest_level': highest, 'last_played': last})
+
+
+class ScoreWriter:
+    """
+    Per-worker buffer of finished games.
+    Scores are written with their aggregates once SCORE_BATCH_SIZE are
+    pending, or by a timer SCORE_FLUSH_SECONDS after the first of a batch
+    was queued, so a busy worker commits one transaction per batch instead
+    of one per game and an idle one still saves its last scores. A batch
+    that fails is retried one score at a time, so a bad row only loses
+    itself.
+    """
+
+    def __init__(self, batch_size: int = SCORE_BATCH_SIZE, flush_seconds: float = SCORE_FLUSH_SECONDS):
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.pending: List[ScoreRow] = []
+        self.pending_replays: List[Optional[ReplayRow]] = []
+        self.timer: Optional[threading.Timer] = None
+        self.app = None
+        self.lock = threading.Lock()
+
+    def add(self, player_name: str, score: int, level: int, timestamp: Optional[datetime] = None,
+            replay: Optional[ReplayRow] = None, mode: str = 'maze'):
+        """Queue a score and its optional replay; must be called inside an app context."""
+        from flask import current_app
+
+        row = (player_name, score, level, timestamp or datetime.utcnow(), mode)
+        if self.batch_size == 1:
+            self._write([row], [replay])
+            return
+
+        with self.lock:
+            if not self.pending:
+                self.app = current_app._get_current_object()
+                # Under gevent this is a greenlet, so idle workers flush too
+                self.timer = threading.Timer(self.flush_seconds, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+            self.pending.append(row)
+            self.pending_replays.append(replay)
+            batch = self._take() if len(self.pending) >= self.batch_size else None
+        if batch:
+            self._write(*batch)
+
+    def _take(self) -> Tuple[List[ScoreRow], List[Optional[ReplayRow]]]:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch = (self.pending, self.pending_replays)
+        self.pending, self.pending_replays = [], []
+        return batch
+
+    def _write(self, batch: List[ScoreRow], replays: List[Optional[ReplayRow]]):
+        try:
+            apply_scores(batch, replays)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) == 1:
+                print(f"Error saving score of {batch[0][0]!r}: {e}")
+                return
+            print(f"Error saving {len(batch)} scores, retrying one at a time: {e}")
+            for row, replay in zip(batch, replays):
+                self._write([row], [replay])
+
+    def flush(self):
+        """Write whatever is pending (run by the timer and at interpreter exit)."""
+        with self.lock:
+            batch, replays = self._take()
+            app = self.app
+        if batch and app is not None:
+            with app.app_context():
+                self._write(batch, replays)
+
+
+def rebuild_stats() -> Dict[str, int]:
+    """
+    Recompute every aggregate from the Score table and replace the stored
+    ones. Returns how many stored rows per table disagreed with the rebuild.
+    """
+    rows = ((s.player_name, s.score, s.level, s.timestamp, s.mode)
+            for s in db.session.query(Score).order_by(Score.id).yield_per(1000))
+    levels, days, players = aggregate(rows)
+
+    expected = {
+        'level_stats': {k: (v[0], v[1], v[2]) for k, v in levels.items()},
+        'daily_stats': {k: (v[0], v[1], v[2]) for k, v in days.items()},
+        'player_stats': {k: tuple(v) for k, v in players.items()}
+    }
+    stored = {
+        'level_stats': {s.level: (s.games, s.total_score, s.best_score) for s in LevelStats.query},
+        'daily_stats': {s.day: (s.games, s.best_score, s.best_player) for s in DailyStats.query},
+        'player_stats': {s.player_name: (s.games, s.total_score, s.best_score, s.highest_level, s.last_played)
+                         for s in PlayerStats.query}
+    }
+    mismatches = {
+        table: sum(1 for key in expected[table].keys() | stored[table].keys()
+                   if expected[table].get(key) != stored[table].get(key))
+        for table in expected
+    }
+
+    LevelStats.query.delete()
+    DailyStats.query.delete()
+    PlayerStats.query.delete()
+    for level, (games, total, best) in levels.items():
+        db.session.add(LevelStats(level=level, games=games, total_score=total, best_score=best))
+    for day, (games, best, best_player) in days.items():
+        db.session.add(DailyStats(day=day, games=games, best_score=best, best_player=best_player))
+    for player_name, (games, total, best, highest, last) in players.items():
+        db.session.add(PlayerStats(player_name=player_name, games=games, total_score=total,
+                                   best_score=best, highest_level=highest, last_played=last))
+    db.session.commit()
+    return mismatches
+
+
+@click.command('rebuild-stats')
+@with_appcontext
+def rebuild_stats_command():
+    """Recompute leaderboard aggregates from the Score table."""
+    mismatches = rebuild_stats()
+    for table, count in mismatches.items():
+        click.echo(f"{table}: {count} row(s) differed from the Score table")
+
+
+score_writer = ScoreWriter()
+atexit.register(score_writer.flush)
@@ -0,0 +1,30 @@
+"""Gunicorn settings: gunicorn -c gunicorn.conf.py "app:create_app()" """
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '4'))
+
+# gevent serves every request on a greenlet, so requests waiting on the
+# database (or holding a WebSocket open) don't tie up a worker.
+# Set GUNICORN_WORKER_CLASS=gthread to go back to a thread per request.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+
+# Concurrent requests per gevent worker
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '1000'))
+
+# Threads per gthread worker
+threads = int(os.environ.get('GUNICORN_THREADS', '32'))
+
+
+def post_fork(server, worker):
+    # Make psycopg2 wait on the event loop instead of blocking the worker
+    if worker_class == 'gevent' and os.environ.get('DATABASE_URL', '').startswith('postgres'):
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+
+
+def worker_exit(server, worker):
+    # Stop the maze candidate pool (gthread/sync workers) so its processes
+    # don't outlive a restarted or killed worker
+    from app import difficulty
+    difficulty.shutdown_executor()
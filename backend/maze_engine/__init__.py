@@ -0,0 +1,23 @@
+"""Maze generation and solving shared by the Flask API and the TigerWorld.py renderer"""
+from maze_engine.generators import (
+    DEFAULT_GENERATOR,
+    GENERATORS,
+    eller_rows,
+    generate_maze,
+    generator_for_level,
+    get_generator,
+    register_generator,
+)
+from maze_engine.maze import (
+    FOOD_EMOJIS,
+    UNREACHED,
+    MazeGraph,
+    add_loops,
+    bfs_path,
+    build_collector_path,
+    create_maze_grid,
+    find_nearest_food,
+    generate_random_maze,
+    get_all_food_positions,
+)
+from maze_engine.stages import set_span_factory, span
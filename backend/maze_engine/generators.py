@@ -0,0 +1,242 @@
+"""Pluggable maze generator registry"""
+import os
+import random
+from typing import Callable, Dict, Iterator, List, Optional
+
+from maze_engine.maze import add_loops, generate_random_maze
+
+# A generator takes (rows, cols, rng, removal_rate) and returns a grid of
+# '#' (walls) and '.' (paths) with (0, 0) connected to (cols-1, rows-1)
+MazeGenerator = Callable[..., List[List[str]]]
+
+GENERATORS: Dict[str, MazeGenerator] = {}
+
+# Force one generator for every level (e.g. MAZE_GENERATOR=kruskal)
+MAZE_GENERATOR = os.environ.get('MAZE_GENERATOR', '')
+
+DEFAULT_GENERATOR = 'backtracker'
+
+
+def register_generator(name: str) -> Callable[[MazeGenerator], MazeGenerator]:
+    """Decorator that adds a generator function to the registry."""
+    def decorator(func: MazeGenerator) -> MazeGenerator:
+        GENERATORS[name] = func
+        return func
+    return decorator
+
+
+def get_generator(name: str) -> MazeGenerator:
+    """Look up a generator by name, falling back to the default one."""
+    return GENERATORS.get(name) or GENERATORS[DEFAULT_GENERATOR]
+
+
+def generator_for_level(level: int) -> str:
+    """
+    Pick the generator used for a level.
+    Long backtracker corridors are the gentlest; Kruskal and Eller mazes
+    branch more often and have more short dead ends.
+    """
+    if MAZE_GENERATOR in GENERATORS:
+        return MAZE_GENERATOR
+    if level <= 3:
+        return 'backtracker'
+    if level <= 7:
+        return 'kruskal'
+    return 'eller'
+
+
+def _link_goal(maze: List[List[str]]):
+    """
+    Connect the goal cell to the carving lattice.
+    Lattice generators carve cells at even (x, y); when a dimension is even
+    the goal sits on an odd coordinate and is joined to the nearest lattice cell.
+    """
+    rows = len(maze)
+    cols = len(maze[0])
+    x, y = cols - 1, rows - 1
+    maze[y][x] = '.'
+    if x % 2 == 1:
+        x -= 1
+        maze[y][x] = '.'
+    if y % 2 == 1:
+        maze[y - 1][x] = '.'
+
+
+def _find(parent: List[int], i: int) -> int:
+    """Union-find root lookup with path halving."""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+@register_generator('backtracker')
+def generate_backtracker_maze(rows: int, cols: int, rng: Optional[random.Random] = None,
+                              removal_rate: Optional[float] = None) -> List[List[str]]:
+    """Recursive-backtracker DFS with connectivity repair (the original generator)."""
+    return generate_random_maze(rows, cols, rng=rng, removal_rate=removal_rate)
+
+
+@register_generator('kruskal')
+def generate_kruskal_maze(rows: int, cols: int, rng: Optional[random.Random] = None,
+                          removal_rate: Optional[float] = None) -> List[List[str]]:
+    """
+    Randomized Kruskal: shuffle every wall between lattice cells and knock
+    it down whenever it joins two different union-find sets.
+    """
+    rng = rng or random
+    maze = [['#' for _ in range(cols)] for _ in range(rows)]
+    width = (cols + 1) // 2
+    height = (rows + 1) // 2
+
+    # Walls as (cell index, neighbour index) pairs going right and down
+    walls = []
+    for cy in range(height):
+        for cx in range(width):
+            maze[cy * 2][cx * 2] = '.'
+            i = cy * width + cx
+            if cx + 1 < width:
+                walls.append((i, i + 1))
+            if cy + 1 < height:
+                walls.append((i, i + width))
+    rng.shuffle(walls)
+
+    parent = list(range(width * height))
+    size = [1] * (width * height)
+    remaining = width * height - 1
+    for a, b in walls:
+        ra, rb = _find(parent, a), _find(parent, b)
+        if ra == rb:
+            continue
+        if size[ra] < size[rb]:
+            ra, rb = rb, ra
+        parent[rb] = ra
+        size[ra] += size[rb]
+
+        ay, ax = divmod(a, width)
+        by, bx = divmod(b, width)
+        maze[ay + by][ax + bx] = '.'
+
+        remaining -= 1
+        if remaining == 0:
+            break
+
+    _link_goal(maze)
+    return add_loops(maze, rng, removal_rate)
+
+
+def eller_rows(rows: int, cols: int, rng: Optional[random.Random] = None) -> Iterator[List[str]]:
+    """
+    Eller's algorithm, yielding the maze one grid row at a time.
+    Only the current row's set labels are kept, so memory is O(cols)
+    no matter how many rows are streamed.
+    """
+    rng = rng or random
+    width = (cols + 1) // 2
+    height = (rows + 1) // 2
+    sets = list(range(width))
+    next_set = width
+
+    for r in range(height):
+        last = r == height - 1
+
+        # Join neighbouring cells in different sets (all of them on the last row)
+        cell_row = ['#'] * cols
+        cell_row[0] = '.'
+        for i in range(width - 1):
+            cell_row[2 * i + 2] = '.'
+            if sets[i] != sets[i + 1] and (last or rng.random() < 0.5):
+                old, new = sets[i + 1], sets[i]
+                sets = [new if s == old else s for s in sets]
+                cell_row[2 * i + 1] = '.'
+        yield cell_row
+
+        if 2 * r + 1 >= rows:
+            break
+        below = ['#'] * cols
+        if last:
+            yield below
+            break
+
+        # Every set carries on downwards through at least one cell
+        members: Dict[int, List[int]] = {}
+        for i, s in enumerate(sets):
+            members.setdefault(s, []).append(i)
+        next_sets = [-1] * width
+        for s, cells in members.items():
+            rng.shuffle(cells)
+            for n, i in enumerate(cells):
+                if n == 0 or rng.random() < 0.3:
+                    below[2 * i] = '.'
+                    next_sets[i] = s
+        for i in range(width):
+            if next_sets[i] == -1:
+                next_sets[i] = next_set
+                next_set += 1
+        sets = next_sets
+        yield below
+
+
+@register_generator('eller')
+def generate_eller_maze(rows: int, cols: int, rng: Optional[random.Random] = None,
+                        removal_rate: Optional[float] = None) -> List[List[str]]:
+    """Eller's row-by-row algorithm collected into a full grid."""
+    rng = rng or random
+    maze = list(eller_rows(rows, cols, rng))
+    _link_goal(maze)
+    return add_loops(maze, rng, removal_rate)
+
+
+@register_generator('fused')
+def generate_fused_maze(rows: int, cols: int, rng: Optional[random.Random] = None,
+                        removal_rate: Optional[float] = None) -> List[List[str]]:
+    """
+    Single-pass carving with connectivity guaranteed by construction.
+    The lattice is anchored on the goal so the goal is always a lattice
+    cell, and the start is linked to the nearest lattice cell before
+    carving. An iterative DFS then spans every lattice cell and knocks out
+    `removal_rate` of the remaining lattice walls as it meets them (each
+    wall is decided once, by its higher-indexed cell), so no reachability
+    check, repair or loop scan is needed afterwards.
+    """
+    rng = rng or random
+    if removal_rate is None:
+        removal_rate = rng.uniform(0.25, 0.4)
+    maze = [['#'] * cols for _ in range(rows)]
+    x0, y0 = (cols - 1) % 2, (rows - 1) % 2
+    width = (cols - 1 - x0) // 2 + 1
+    height = (rows - 1 - y0) // 2 + 1
+
+    # Link the start to the first lattice cell (a no-op for odd dimensions)
+    maze[0][0] = maze[0][x0] = maze[y0][x0] = '.'
+
+    visited = bytearray(width * height)
+    directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+    visited[0] = 1
+    stack = [(0, rng.sample(directions, 4))]
+    while stack:
+        i, pending = stack[-1]
+        if not pending:
+            stack.pop()
+            continue
+        dx, dy = pending.pop()
+        cy, cx = divmod(i, width)
+        nx, ny = cx + dx, cy + dy
+        if not (0 <= nx < width and 0 <= ny < height):
+            continue
+        n = ny * width + nx
+        wx, wy = x0 + cx * 2 + dx, y0 + cy * 2 + dy
+        if not visited[n]:
+            visited[n] = 1
+            maze[wy][wx] = '.'
+            maze[y0 + ny * 2][x0 + nx * 2] = '.'
+            stack.append((n, rng.sample(directions, 4)))
+        elif n < i and maze[wy][wx] == '#' and rng.random() < removal_rate:
+            maze[wy][wx] = '.'
+    return maze
+
+
+def generate_maze(name: str, rows: int, cols: int, rng: Optional[random.Random] = None,
+                  removal_rate: Optional[float] = None) -> List[List[str]]:
+    """Generate a maze layout with the named generator."""
+    return get_generator(name)(rows, cols, rng=rng, removal_rate=removal_rate)
@@ -1,8 +1,11 @@
-"""Maze generation and pathfinding algorithms for Tiger World game"""
+"""Maze generation and pathfinding algorithms shared by the API and the video renderer"""
 import random
+from array import array
 from collections import deque
 from typing import List, Tuple, Set, Optional
 
+from maze_engine.stages import span
+
 # Tiger-themed food emojis - meaty foods for the tiger!
 FOOD_EMOJIS = [
     '🍗', '🍖', '🍔', '🍟', '🍕',
@@ -10,13 +13,20 @@ FOOD_EMOJIS = [
     '🥩', '🍱', '🧀', '🥓'
 ]
 
-def generate_random_maze(rows: int, cols: int) -> List[List[str]]:
+# Distance value for cells a search never reached
+UNREACHED = -1
+
+def generate_random_maze(rows: int, cols: int, rng: Optional[random.Random] = None,
+                         removal_rate: Optional[float] = None) -> List[List[str]]:
     """
     Generate a random maze using recursive DFS.
     Returns a 2D list of '#' (walls) or '.' (paths).
     Post-processes to add loops and alternative paths for better gameplay.
     GUARANTEES a valid path from start (0,0) to goal (rows-1, cols-1).
+    Pass an `rng` to make generation reproducible, and `removal_rate` to fix
+    the share of candidate walls knocked out (random 25-40% by default).
     """
+    rng = rng or random
     maze = [['#' for _ in range(cols)] for _ in range(rows)]
     directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]
     
@@ -25,7 +35,7 @@ def generate_random_maze(rows: int, cols: int) -> List[List[str]]:
     
     def carve(x: int, y: int):
         maze[y][x] = '.'
-        random.shuffle(directions)
+        rng.shuffle(directions)
         
         for dx, dy in directions:
             nx, ny = x + 2*dx, y + 2*dy
@@ -34,7 +44,8 @@ def generate_random_maze(rows: int, cols: int) -> List[List[str]]:
                 carve(nx, ny)
     
     # Start carving from top-left corner
-    carve(0, 0)
+    with span('maze.carve'):
+        carve(0, 0)
     
     # Ensure start and goal positions are open
     start_x, start_y = 0, 0
@@ -104,11 +115,34 @@ def generate_random_maze(rows: int, cols: int) -> List[List[str]]:
                     queue.append((nx, ny, path + [(nx, ny)]))
     
     # Check and fix path if needed
-    if not is_path_exists():
-        carve_path_to_goal()
+    with span('maze.connect'):
+        if not is_path_exists():
+            carve_path_to_goal()
     
     # IMPORTANT: Remove random walls to create loops and alternative paths
     # This allows players to escape from ghosts more easily
+    add_loops(maze, rng, removal_rate)
+    
+    return maze
+
+
+def add_loops(maze: List[List[str]], rng: Optional[random.Random] = None,
+              removal_rate: Optional[float] = None) -> List[List[str]]:
+    """
+    Knock out interior walls that touch 2+ paths to create loops.
+    Removes `removal_rate` of the candidates (random 25-40% by default).
+    Modifies and returns the maze.
+    """
+    with span('maze.add_loops'):
+        return _add_loops(maze, rng or random, removal_rate)
+
+
+def _add_loops(maze: List[List[str]], rng: random.Random,
+               removal_rate: Optional[float]) -> List[List[str]]:
+    rows = len(maze)
+    cols = len(maze[0]) if rows > 0 else 0
+    directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+    
     walls_to_remove = []
     for y in range(1, rows - 1):
         for x in range(1, cols - 1):
@@ -116,8 +150,7 @@ def generate_random_maze(rows: int, cols: int) -> List[List[str]]:
                 # Count adjacent paths
                 adjacent_paths = 0
                 for dx, dy in directions:
-                    nx, ny = x + dx, y + dy
-                    if in_bounds(nx, ny) and maze[ny][nx] == '.':
+                    if maze[y + dy][x + dx] == '.':
                         adjacent_paths += 1
                 
                 # If this wall has 2+ adjacent paths, it's a candidate for removal
@@ -125,9 +158,10 @@ def generate_random_maze(rows: int, cols: int) -> List[List[str]]:
                     walls_to_remove.append((x, y))
     
     # Remove 25-40% of candidate walls to create multiple paths
-    removal_rate = random.uniform(0.25, 0.4)
+    if removal_rate is None:
+        removal_rate = rng.uniform(0.25, 0.4)
     walls_to_remove_count = int(len(walls_to_remove) * removal_rate)
-    random.shuffle(walls_to_remove)
+    rng.shuffle(walls_to_remove)
     
     for i in range(walls_to_remove_count):
         x, y = walls_to_remove[i]
@@ -136,11 +170,12 @@ def generate_random_maze(rows: int, cols: int) -> List[List[str]]:
     return maze
 
 
-def create_maze_grid(maze_layout: List[List[str]]) -> List[List[str]]:
+def create_maze_grid(maze_layout: List[List[str]], rng: Optional[random.Random] = None) -> List[List[str]]:
     """
     Convert maze layout to emoji grid.
     Replaces '.' paths with random food emojis.
     """
+    rng = rng or random
     rows = len(maze_layout)
     cols = len(maze_layout[0]) if rows > 0 else 0
     
@@ -149,7 +184,7 @@ def create_maze_grid(maze_layout: List[List[str]]) -> List[List[str]]:
         row = []
         for x in range(cols):
             if maze_layout[y][x] == '.':
-                row.append(random.choice(FOOD_EMOJIS))
+                row.append(rng.choice(FOOD_EMOJIS))
             else:
                 row.append('#')
         maze_grid.append(row)
@@ -175,24 +210,9 @@ def bfs_path(grid: List[List[str]], start: Tuple[int, int], goal: Tuple[int, int
     if grid[sy][sx] == '#' or grid[gy][gx] == '#':
         return []
     
-    queue = deque()
-    queue.append((sx, sy, [(sx, sy)]))
-    visited = set([(sx, sy)])
-    directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-    
-    while queue:
-        cx, cy, path = queue.popleft()
-        if (cx, cy) == (gx, gy):
-            return path
-        
-        for dx, dy in directions:
-            nx, ny = cx + dx, cy + dy
-            if 0 <= nx < cols and 0 <= ny < rows:
-                if grid[ny][nx] != '#' and (nx, ny) not in visited:
-                    visited.add((nx, ny))
-                    queue.append((nx, ny, path + [(nx, ny)]))
-    
-    return []
+    graph = MazeGraph(grid)
+    path = graph.search(graph.index(start), {graph.index(goal)})
+    return [graph.cell(i) for i in path] if path else []
 
 
 def find_nearest_food(start: Tuple[int, int], foods: Set[Tuple[int, int]], grid: List[List[str]]) -> Optional[Tuple[int, int]]:
@@ -232,38 +252,43 @@ def build_collector_path(grid: List[List[str]], start: Tuple[int, int],
     """
     Build a path that visits all food items (greedy nearest-first) then goes to goal.
     Returns list of (x, y) coordinates representing the complete path.
+    Each leg is one BFS over the flat adjacency that stops at the nearest
+    remaining food and walks its parent links back, so no partial paths
+    are copied while searching.
     """
-    path = []
-    current = start
-    leftover_food = set(food_positions)
+    rows = len(grid)
+    cols = len(grid[0]) if rows > 0 else 0
+    
+    def passable(cell: Tuple[int, int]) -> bool:
+        x, y = cell
+        return 0 <= x < cols and 0 <= y < rows and grid[y][x] != '#'
+    
+    # Foods off the grid or in walls can never be reached
+    if not passable(start) or not passable(goal) or not all(map(passable, food_positions)):
+        return []
+    
+    graph = MazeGraph(grid)
+    current = graph.index(start)
+    leftover_food = {graph.index(food) for food in food_positions}
+    path: List[int] = []
     
     while leftover_food:
-        nearest = find_nearest_food(current, leftover_food, grid)
-        if nearest is None:
-            return []  # No path to any remaining food
-        
-        segment = bfs_path(grid, current, nearest)
+        segment = graph.search(current, leftover_food)
         if not segment:
-            return []
+            return []  # No path to any remaining food
         
         # Avoid duplicating the starting point
-        if path:
-            segment = segment[1:]
-        
-        path.extend(segment)
-        current = nearest
-        leftover_food.remove(nearest)
+        path.extend(segment[1:] if path else segment)
+        current = segment[-1]
+        leftover_food.remove(current)
     
     # Finally go from last food to goal
-    final_segment = bfs_path(grid, current, goal)
+    final_segment = graph.search(current, {graph.index(goal)})
     if not final_segment:
         return []
+    path.extend(final_segment[1:] if path else final_segment)
     
-    if path:
-        final_segment = final_segment[1:]
-    path.extend(final_segment)
-    
-    return path
+    return [graph.cell(i) for i in path]
 
 
 def get_all_food_positions(grid: List[List[str]]) -> List[Tuple[int, int]]:
@@ -278,3 +303,91 @@ def get_all_food_positions(grid: List[List[str]]) -> List[Tuple[int, int]]:
                 food_positions.append((x, y))
     
     return food_positions
+
+
+class MazeGraph:
+    """
+    Flat adjacency view of a maze grid, built once per maze.
+    Cells are indexed y * cols + x; only passable cells have neighbours.
+    """
+
+    def __init__(self, grid: List[List[str]]):
+        self.rows = len(grid)
+        self.cols = len(grid[0]) if self.rows > 0 else 0
+        size = self.rows * self.cols
+        neighbours: List[Tuple[int, ...]] = [()] * size
+        # Tuples reference one shared int per cell rather than a fresh copy each
+        cells = list(range(size))
+
+        for y in range(self.rows):
+            for x in range(self.cols):
+                if grid[y][x] == '#':
+                    continue
+                adjacent = []
+                for dx, dy in ((0, -1), (1, 0), (0, 1), (-1, 0)):
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < self.cols and 0 <= ny < self.rows and grid[ny][nx] != '#':
+                        adjacent.append(cells[ny * self.cols + nx])
+                neighbours[y * self.cols + x] = tuple(adjacent)
+
+        self.neighbours = neighbours
+
+    def index(self, cell: Tuple[int, int]) -> int:
+        return cell[1] * self.cols + cell[0]
+
+    def cell(self, index: int) -> Tuple[int, int]:
+        y, x = divmod(index, self.cols)
+        return (x, y)
+
+    def search(self, source: int, targets: Set[int]) -> List[int]:
+        """
+        BFS from `source` to whichever of `targets` it reaches first.
+        Returns the cell indices from source to that target, or [] if none
+        is reachable. Neighbours are visited in (up, right, down, left)
+        order, so ties resolve the same way as find_nearest_food.
+        """
+        if source in targets:
+            return [source]
+        neighbours = self.neighbours
+        parent = {source: source}
+        queue = deque([source])
+        while queue:
+            v = queue.popleft()
+            for w in neighbours[v]:
+                if w in parent:
+                    continue
+                parent[w] = v
+                if w in targets:
+                    path = [w]
+                    while w != source:
+                        w = parent[w]
+                        path.append(w)
+                    path.reverse()
+                    return path
+                queue.append(w)
+        return []
+
+    def distances(self, source: int, max_depth: Optional[int] = None) -> array:
+        """
+        Level-synchronous BFS from `source`, optionally stopping after
+        `max_depth` levels. Unreached cells are UNREACHED.
+        """
+        dist = array('h', [UNREACHED]) * (self.rows * self.cols)
+        if not self.neighbours[source]:
+            dist[source] = 0
+            return dist
+
+        neighbours = self.neighbours
+        dist[source] = 0
+        frontier = [source]
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for v in frontier:
+                for w in neighbours[v]:
+                    if dist[w] == UNREACHED:
+                        dist[w] = depth
+                        next_frontier.append(w)
+            frontier = next_frontier
+        return dist
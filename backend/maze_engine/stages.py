@@ -0,0 +1,17 @@
+"""Optional timing hook around engine stages"""
+import contextlib
+from typing import Callable, ContextManager, Optional
+
+_noop = contextlib.nullcontext()
+_span_factory: Optional[Callable[[str], ContextManager]] = None
+
+
+def span(name: str) -> ContextManager:
+    """Context that times stage `name` with the installed factory (a no-op without one)."""
+    return _span_factory(name) if _span_factory is not None else _noop
+
+
+def set_span_factory(factory: Optional[Callable[[str], ContextManager]]):
+    """Install the function that times stages, e.g. app.profiling.span."""
+    global _span_factory
+    _span_factory = factory
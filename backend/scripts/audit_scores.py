@@ -0,0 +1,211 @@
+"""Re-verify saved scores against their level limits and replays.
+
+Run from the backend folder:
+    python -m scripts.audit_scores --workers 8 --out audit_flags.jsonl
+
+Scores are read from the database in id order, CHUNK rows at a time, and
+checked across a process pool. Rows with a replay are re-simulated on the
+replay's maze: the last move must end on the goal, and the stored score
+may not exceed what the foods eaten on the way could earn at the fastest
+plausible pace. (Moves into walls are already dropped when the server
+records them, so a replay that leaves the open cells is corrupt.) Rows without one are only
+checked against the highest score their level allows. Endless games have
+no food limit and are saved as level 1, so they are only checked for a
+well-formed score. Flagged rows are appended to --out as JSON lines.
+
+Progress is checkpointed after every chunk (last score id and the size of
+the output file), so an interrupted audit continues where it stopped when
+run again with --resume.
+"""
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from app.game import compute_score, get_level_config
+from app.replay import MOVE_DELTAS, REPLAY_MAX_BYTES, decode_replay, iter_runs
+from maze_engine.maze import get_all_food_positions
+
+# Fastest sustained pace a player can move, in cells per second
+MAX_MOVES_PER_SECOND = 12
+
+# (score id, player_name, score, level, mode, timestamp, time_elapsed, replay data)
+AuditRow = Tuple[int, str, int, int, str, str, Optional[float], Optional[bytes]]
+
+
+def level_max_score(level: int) -> int:
+    """Highest score a level allows: every cell a food and the full time bonus."""
+    config = get_level_config(level)
+    return compute_score(config['rows'] * config['cols'], 0, level)
+
+
+def simulate(data: bytes, level: int) -> Tuple[List[str], int, int]:
+    """
+    Replay the moves on the replay's maze.
+    Returns (problems, moves made, distinct foods eaten).
+    """
+    problems = []
+    try:
+        header, grid, moves = decode_replay(data)
+    except ValueError as e:
+        return [f'bad_replay: {e}'], 0, 0
+
+    config = get_level_config(level)
+    if (header['rows'], header['cols']) != (config['rows'], config['cols']):
+        problems.append('maze_size_mismatch')
+
+    foods = set(get_all_food_positions(grid))
+    rows, cols = header['rows'], header['cols']
+    x, y = header['start']
+    # The player starts on the first food
+    eaten = {(x, y)} & foods
+    steps = 0
+    for direction, run in iter_runs(moves):
+        dx, dy = MOVE_DELTAS[direction]
+        for _ in range(run):
+            x, y = x + dx, y + dy
+            if not (0 <= x < cols and 0 <= y < rows) or grid[y][x] == '#':
+                problems.append(f'bad_replay: step {steps + 1} leaves the maze at {[x, y]}')
+                return problems, steps, len(eaten)
+            steps += 1
+            if (x, y) in foods:
+                eaten.add((x, y))
+
+    # Games end on the goal; only replays cut off at REPLAY_MAX_BYTES may not
+    if (x, y) != header['goal'] and len(moves) < REPLAY_MAX_BYTES:
+        problems.append('ended_off_goal')
+    return problems, steps, len(eaten)
+
+
+def audit_row(row: AuditRow) -> Optional[dict]:
+    """Check one score; returns its flag record, or None if it looks valid."""
+    score_id, player_name, score, level, mode, timestamp, time_elapsed, data = row
+    reasons = []
+    flag = {'score_id': score_id, 'player_name': player_name, 'score': score,
+            'level': level, 'mode': mode, 'timestamp': timestamp}
+
+    if score < 0 or level < 1 or score % level or (mode == 'endless' and level != 1):
+        reasons.append('malformed_score')
+    elif mode != 'endless' and score > level_max_score(level):
+        reasons.append('above_level_max')
+
+    if data is not None:
+        problems, steps, eaten = simulate(data, level)
+        reasons.extend(problems)
+        fastest = steps / MAX_MOVES_PER_SECOND
+        if time_elapsed is not None and time_elapsed < fastest:
+            reasons.append('faster_than_possible')
+        best = compute_score(eaten, fastest, level)
+        if score > best:
+            reasons.append('above_replay_max')
+        flag.update(moves=steps, foods_eaten=eaten, replay_max_score=best, time_elapsed=time_elapsed)
+
+    if not reasons:
+        return None
+    flag['reasons'] = reasons
+    return flag
+
+
+def audit_chunk(rows: List[AuditRow]) -> List[dict]:
+    """Audit one chunk of rows (runs inside a worker process)."""
+    return [flag for flag in map(audit_row, rows) if flag is not None]
+
+
+def read_chunks(after_id: int, chunk_size: int):
+    """Yield lists of AuditRow in score id order, keyset-paginated."""
+    from app import db
+    from app.models import Replay, Score
+
+    while True:
+        rows = (db.session.query(Score.id, Score.player_name, Score.score, Score.level,
+                                 Score.mode, Score.timestamp, Replay.time_elapsed, Replay.data)
+                .outerjoin(Replay, Replay.score_id == Score.id)
+                .filter(Score.id > after_id)
+                .order_by(Score.id)
+                .limit(chunk_size)
+                .all())
+        db.session.expunge_all()
+        if not rows:
+            return
+        after_id = rows[-1][0]
+        yield [(r[0], r[1], r[2], r[3], r[4], r[5].isoformat() if r[5] else None, r[6],
+                bytes(r[7]) if r[7] is not None else None) for r in rows]
+
+
+def load_checkpoint(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, state: dict):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk', type=int, default=5000, help='rows read and audited per task')
+    parser.add_argument('--out', default='audit_flags.jsonl')
+    parser.add_argument('--checkpoint', default=None, help='defaults to <out>.checkpoint')
+    parser.add_argument('--resume', action='store_true', help='continue from the checkpoint')
+    args = parser.parse_args()
+
+    from app import create_app
+    checkpoint = args.checkpoint or args.out + '.checkpoint'
+    state = {'last_id': 0, 'out_bytes': 0, 'scanned': 0, 'flagged': 0}
+    if args.resume and os.path.exists(checkpoint):
+        state = load_checkpoint(checkpoint)
+        print(f"Resuming after score id {state['last_id']} ({state['scanned']} scanned)")
+
+    if args.resume and state['out_bytes'] > (os.path.getsize(args.out) if os.path.exists(args.out) else 0):
+        parser.error(f"{args.out} is shorter than its checkpoint; rerun without --resume")
+
+    # Drop flags written after the last checkpoint so a resumed run never repeats them
+    out = open(args.out, 'r+b' if args.resume and os.path.exists(args.out) else 'wb')
+    out.truncate(state['out_bytes'])
+    out.seek(state['out_bytes'])
+    save_checkpoint(checkpoint, state)
+
+    app = create_app()
+    started = time.perf_counter()
+    scanned = 0
+    with app.app_context(), ProcessPoolExecutor(max_workers=args.workers) as pool, out:
+        # Keep a bounded window of chunks in flight and commit them in order
+        window = deque()
+
+        def commit(future, last_id, count):
+            flags = future.result()
+            for flag in flags:
+                out.write(json.dumps(flag).encode() + b'\n')
+            out.flush()
+            os.fsync(out.fileno())
+            state['last_id'] = last_id
+            state['out_bytes'] = out.tell()
+            state['scanned'] += count
+            state['flagged'] += len(flags)
+            save_checkpoint(checkpoint, state)
+
+        for rows in read_chunks(state['last_id'], args.chunk):
+            window.append((pool.submit(audit_chunk, rows), rows[-1][0], len(rows)))
+            scanned += len(rows)
+            if len(window) >= args.workers * 2:
+                commit(*window.popleft())
+        while window:
+            commit(*window.popleft())
+
+    elapsed = time.perf_counter() - started
+    rate = scanned / elapsed if elapsed > 0 else 0
+    print(f"Scanned {scanned} scores in {elapsed:.1f}s ({rate:,.0f}/s), "
+          f"{state['flagged']} flagged in total -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""Concurrency benchmark for gunicorn worker classes against a slow database.
+
+Run from the backend folder:
+    python -m scripts.bench_async --classes gthread gevent --concurrency 400 --latency-ms 200
+
+Starts gunicorn with gunicorn.conf.py once per worker class, on a
+temporary SQLite database where every statement is delayed by
+--latency-ms (standing in for a slow Postgres), and drives it with
+--concurrency clients for --seconds. Slow queries hold a pooled
+connection either way, so --pool-size bounds both worker classes; gevent
+lifts the per-worker thread limit on top of it. With --new-games, one request in
+--new-game-every creates a maze, to check CPU-bound work doesn't stall
+the I/O-bound routes. The rate limiter runs on every request with limits
+too high to reject any, so its cost is measured too (--no-rate-limit
+turns it off).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from typing import List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = ['/api/leaderboard', '/api/stats/levels', '/api/health', '/api/levels']
+
+
+def create_slow_app():
+    """App factory for the benchmark server: delays every SQL statement."""
+    from sqlalchemy import event
+
+    from app import create_app, db
+
+    latency = float(os.environ.get('BENCH_DB_LATENCY_MS', '0')) / 1000
+    app = create_app()
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def slow_query(conn, cursor, statement, parameters, context, executemany):
+        # time.sleep yields to other greenlets under gevent, like a socket wait would
+        time.sleep(latency)
+
+    return app
+
+
+def start_server(worker_class: str, port: int, args, db_path: str) -> subprocess.Popen:
+    env = dict(os.environ,
+               PORT=str(port),
+               DATABASE_URL=f'sqlite:///{db_path}',
+               RATE_LIMIT_ENABLED='0' if args.no_rate_limit else '1',
+               RATE_LIMIT_DB=os.path.join(os.path.dirname(db_path), 'ratelimit.db'),
+               RATE_LIMIT_CLIENT_RATE='1e9',
+               RATE_LIMIT_CLIENT_BURST='1e9',
+               RATE_LIMIT_GLOBAL_RATE='1e9',
+               RATE_LIMIT_GLOBAL_BURST='1e9',
+               BENCH_DB_LATENCY_MS=str(args.latency_ms),
+               WEB_CONCURRENCY=str(args.workers),
+               GUNICORN_WORKER_CLASS=worker_class,
+               GUNICORN_THREADS=str(args.threads),
+               DB_POOL_SIZE=str(args.pool_size),
+               DB_MAX_OVERFLOW='0')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-b', f'127.0.0.1:{port}',
+         'scripts.bench_async:create_slow_app()'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/api/health', timeout=1).read()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f'{worker_class} server did not start')
+
+
+def run_load(port: int, args) -> Tuple[List[float], List[float], int]:
+    """Returns (I/O route latencies, new-game latencies, errors)."""
+    base = f'http://127.0.0.1:{port}'
+    latencies: List[float] = []
+    game_latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    stop = time.monotonic() + args.seconds
+
+    def client(n: int):
+        i = n
+        while time.monotonic() < stop:
+            i += 1
+            new_game = args.new_games and i % args.new_game_every == 0
+            if new_game:
+                req = urllib.request.Request(f'{base}/api/game/new', data=json.dumps({'level': 5}).encode(),
+                                             headers={'Content-Type': 'application/json'})
+            else:
+                req = urllib.request.Request(base + PATHS[i % len(PATHS)])
+            started = time.perf_counter()
+            try:
+                urllib.request.urlopen(req, timeout=30).read()
+            except OSError:
+                with lock:
+                    errors[0] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                (game_latencies if new_game else latencies).append(elapsed)
+
+    clients = [threading.Thread(target=client, args=(n,)) for n in range(args.concurrency)]
+    for c in clients:
+        c.start()
+    for c in clients:
+        c.join()
+    return latencies, game_latencies, errors[0]
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    return statistics.quantiles(values, n=100)[int(p) - 1] if len(values) > 1 else values[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--classes', nargs='+', default=['gthread', 'gevent'])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=32, help='threads per gthread worker')
+    parser.add_argument('--concurrency', type=int, default=400)
+    parser.add_argument('--latency-ms', type=float, default=200)
+    parser.add_argument('--pool-size', type=int, default=30, help='database connections per worker')
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--new-games', action='store_true')
+    parser.add_argument('--new-game-every', type=int, default=20)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--no-rate-limit', action='store_true', help="run without the rate limiter")
+    args = parser.parse_args()
+
+    print(f"{args.concurrency} clients, {args.latency_ms:.0f} ms per query, {args.workers} workers, "
+          f"{args.pool_size} connections each, rate limiter {'off' if args.no_rate_limit else 'on'}")
+    print(f"{'class':<9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'new game p95':>13}")
+    for worker_class in args.classes:
+        with tempfile.TemporaryDirectory() as tmp:
+            server = start_server(worker_class, args.port, args, os.path.join(tmp, 'bench.db'))
+            try:
+                latencies, game_latencies, errors = run_load(args.port, args)
+            finally:
+                server.terminate()
+                server.wait()
+        total = len(latencies) + len(game_latencies)
+        game_p95 = f"{percentile(game_latencies, 95) * 1000:>13.0f}" if game_latencies else f"{'-':>13}"
+        print(f"{worker_class:<9} {total / args.seconds:>8.0f} {percentile(latencies, 50) * 1000:>8.0f} "
+              f"{percentile(latencies, 95) * 1000:>8.0f} {percentile(latencies, 99) * 1000:>8.0f} "
+              f"{errors:>7} {game_p95}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Throughput and gameplay benchmark for the registered maze generators.
+
+Run from the backend folder:
+    python -m scripts.bench_generators --sizes 15 19 25 --count 200
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.difficulty import difficulty_score, maze_metrics
+from maze_engine.generators import GENERATORS, generate_maze
+
+
+def bench(name: str, size: int, count: int, seed: int) -> dict:
+    """Time `count` generations and average their gameplay metrics."""
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    mazes = [generate_maze(name, size, size, rng=rng) for _ in range(count)]
+    elapsed = time.perf_counter() - start
+
+    metrics = [maze_metrics(m) for m in mazes]
+    return {
+        'mazes_per_sec': count / elapsed,
+        'ms_per_maze': elapsed / count * 1000,
+        'dead_ends': statistics.mean(m['dead_ends'] for m in metrics),
+        'branching': statistics.mean(m['branching_factor'] for m in metrics),
+        'difficulty': statistics.mean(difficulty_score(m) for m in metrics)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[15, 19, 25])
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--generators', nargs='+', default=sorted(GENERATORS))
+    args = parser.parse_args()
+
+    print(f"{'generator':<12} {'size':>5} {'mazes/s':>9} {'ms/maze':>8} "
+          f"{'dead ends':>9} {'branching':>9} {'difficulty':>10}")
+    for size in args.sizes:
+        for name in args.generators:
+            r = bench(name, size, args.count, args.seed)
+            print(f"{name:<12} {size:>5} {r['mazes_per_sec']:>9.0f} {r['ms_per_maze']:>8.2f} "
+                  f"{r['dead_ends']:>9.1f} {r['branching']:>9.2f} {r['difficulty']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Pre-generate the memory-mapped maze corpus read by every API worker.
+
+Run from the backend folder:
+    python -m scripts.build_corpus --levels 1 2 3 --count 5000 --workers 8
+
+Each level file is written in full and then swapped in atomically, so
+running servers pick up the new corpus without a restart.
+"""
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple
+
+from app.corpus import (CORPUS_LEVELS, MAZE_CORPUS_DIR, corpus_path, encode_record,
+                         record_size, write_corpus)
+from app.difficulty import MAZE_CANDIDATES, difficulty_target, generate_targeted_maze
+from app.game import get_level_config
+from maze_engine.maze import build_collector_path, create_maze_grid, get_all_food_positions
+
+# Records generated per pool task
+BATCH_SIZE = 50
+
+
+def build_batch(args: Tuple[int, int, int, int]) -> bytes:
+    """Generate `count` packed records for a level (runs inside a worker process)."""
+    level, batch, count, seed = args
+    rng = random.Random(f"{seed}:{level}:{batch}")
+    config = get_level_config(level)
+    rows, cols = config['rows'], config['cols']
+    goal = (cols - 1, rows - 1)
+
+    records = []
+    for _ in range(count):
+        layout, metrics = generate_targeted_maze(
+            rows, cols, difficulty_target(level), candidates=MAZE_CANDIDATES,
+            generator=config['generator'], rng=rng, parallel=False
+        )
+        grid = create_maze_grid(layout, rng)
+        path = build_collector_path(grid, (0, 0), get_all_food_positions(grid), goal)
+        records.append(encode_record(grid, len(path), metrics['difficulty']))
+    return b''.join(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--levels', type=int, nargs='+', default=list(range(1, CORPUS_LEVELS + 1)))
+    parser.add_argument('--count', type=int, default=2000, help='mazes per level')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--out', default=MAZE_CORPUS_DIR)
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.getrandbits(32)
+    os.makedirs(args.out, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for level in args.levels:
+            if level > CORPUS_LEVELS:
+                print(f"level {level}: levels above {CORPUS_LEVELS} use level {CORPUS_LEVELS}'s file")
+                continue
+            config = get_level_config(level)
+            jobs = [(level, b, min(BATCH_SIZE, args.count - start), seed)
+                    for b, start in enumerate(range(0, args.count, BATCH_SIZE))]
+
+            started = time.perf_counter()
+            path = corpus_path(level, args.out)
+            size = record_size(config['rows'], config['cols'])
+            records = (batch[i:i + size]
+                       for batch in pool.map(build_batch, jobs)
+                       for i in range(0, len(batch), size))
+            written = write_corpus(path, config['rows'], config['cols'], records)
+            elapsed = time.perf_counter() - started
+
+            print(f"level {level}: {written} mazes {config['rows']}x{config['cols']} "
+                  f"({config['generator']}) in {elapsed:.1f}s -> {path} "
+                  f"({os.path.getsize(path) / 1024:.0f} KiB)")
+
+
+if __name__ == '__main__':
+    main()
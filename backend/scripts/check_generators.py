@@ -0,0 +1,88 @@
+"""Connectivity sweep over the registered maze generators.
+
+Run from the backend folder:
+    python -m scripts.check_generators --seeds 200 --min-size 2 --max-size 31
+
+Generates a maze for every seed and every (rows, cols) pair in the size
+range and checks that it has the right shape, that the start and goal
+are open and reachable from each other, and that no open cell is cut off
+from the start. Exits non-zero and prints the first failures otherwise.
+tests/test_generators.py runs a shorter sweep with the same checks.
+"""
+import argparse
+import random
+import sys
+from collections import deque
+from typing import List, Optional
+
+from maze_engine.generators import GENERATORS, generate_maze
+
+
+def check_maze(maze: List[List[str]], rows: int, cols: int) -> Optional[str]:
+    """Return a description of the first broken property, or None."""
+    if len(maze) != rows or any(len(row) != cols for row in maze):
+        return 'wrong shape'
+    if any(c not in '#.' for row in maze for c in row):
+        return 'unexpected cell value'
+    goal = (cols - 1, rows - 1)
+    if maze[0][0] != '.' or maze[goal[1]][goal[0]] != '.':
+        return 'start or goal is a wall'
+
+    seen = {(0, 0)}
+    queue = deque([(0, 0)])
+    while queue:
+        x, y = queue.popleft()
+        for nx, ny in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+            if 0 <= nx < cols and 0 <= ny < rows and maze[ny][nx] == '.' and (nx, ny) not in seen:
+                seen.add((nx, ny))
+                queue.append((nx, ny))
+    if goal not in seen:
+        return 'goal unreachable'
+    open_cells = sum(row.count('.') for row in maze)
+    if open_cells != len(seen):
+        return f'{open_cells - len(seen)} open cell(s) cut off from the start'
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--generators', nargs='+', default=sorted(GENERATORS))
+    parser.add_argument('--seeds', type=int, default=200)
+    parser.add_argument('--min-size', type=int, default=2)
+    parser.add_argument('--max-size', type=int, default=31)
+    parser.add_argument('--show', type=int, default=5, help='failures printed per generator')
+    args = parser.parse_args()
+
+    sizes = range(args.min_size, args.max_size + 1)
+    failed = False
+    for name in args.generators:
+        checked = 0
+        failures = []
+        for seed in range(args.seeds):
+            rng = random.Random(seed)
+            rows, cols = rng.choice(sizes), rng.choice(sizes)
+            # Also sweep the removal rate end to end: 0 leaves a perfect maze
+            removal_rate = rng.choice((0.0, 1.0, None))
+            maze = generate_maze(name, rows, cols, rng=rng, removal_rate=removal_rate)
+            checked += 1
+            problem = check_maze(maze, rows, cols)
+            if problem:
+                failures.append(f'seed={seed} size={rows}x{cols} removal_rate={removal_rate}: {problem}')
+
+        for rows in sizes:
+            for cols in sizes:
+                maze = generate_maze(name, rows, cols, rng=random.Random(rows * 1000 + cols))
+                checked += 1
+                problem = check_maze(maze, rows, cols)
+                if problem:
+                    failures.append(f'size={rows}x{cols}: {problem}')
+
+        print(f"{name:<12} {checked:>6} mazes  {len(failures):>4} failed")
+        for failure in failures[:args.show]:
+            print(f"    {failure}")
+        failed = failed or bool(failures)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Bytes held per in-memory game session.
+
+Run from the backend folder:
+    python -m scripts.measure_sessions --levels 1 6 --count 200
+
+Compares GameSession with the dict layout it replaced (emoji grid lists,
+food and path tuples), and a GameSession once hints have built its
+navigation index.
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+import uuid
+
+from app.game import get_level_config
+from app.session import GameSession
+from maze_engine.generators import generate_maze
+from maze_engine.maze import build_collector_path, create_maze_grid, get_all_food_positions
+
+
+def legacy_session(level, grid, goal, path):
+    """The session dict as create_new_game built it before GameSession."""
+    foods = get_all_food_positions(grid)
+    return {
+        'id': str(uuid.uuid4()),
+        'level': level,
+        'rows': len(grid),
+        'cols': len(grid[0]),
+        'generator': 'backtracker',
+        'maze_grid': [row[:] for row in grid],
+        'start': (0, 0),
+        'goal': goal,
+        'food_positions': foods,
+        'optimal_path': list(path),
+        'foods_collected': 0,
+        'total_foods': len(foods),
+        'score': 0,
+        'status': 'active',
+        'path_length': len(path),
+        'maze_metrics': {'open_cells': 0, 'dead_ends': 0, 'junctions': 0, 'branching_factor': 0.0,
+                         'collector_estimate': 0, 'food_spread': 0.0, 'goal_distance': 0,
+                         'difficulty': 0.0, 'target': 0.0}
+    }
+
+
+def compact_session(level, grid, goal, path, with_navigation=False):
+    session = GameSession.from_grid(str(uuid.uuid4()), level, grid, goal, path=path)
+    if with_navigation:
+        session.navigation_index()
+    return session
+
+
+def measure(build, mazes) -> float:
+    """Average traced bytes retained per session built by `build`."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [build(*maze) for maze in mazes]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessions
+    return (after - before) / len(mazes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 6])
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'level':>5} {'size':>7} {'dict':>10} {'session':>10} {'+ hints':>10} {'ratio':>6}")
+    for level in args.levels:
+        config = get_level_config(level)
+        rows, cols = config['rows'], config['cols']
+        goal = (cols - 1, rows - 1)
+        mazes = []
+        for _ in range(args.count):
+            grid = create_maze_grid(generate_maze(config['generator'], rows, cols, rng=rng), rng)
+            path = build_collector_path(grid, (0, 0), get_all_food_positions(grid), goal)
+            mazes.append((level, grid, goal, path))
+
+        legacy = measure(legacy_session, mazes)
+        compact = measure(compact_session, mazes)
+        with_hints = measure(lambda *m: compact_session(*m, with_navigation=True), mazes)
+        print(f"{level:>5} {rows:>3}x{cols:<3} {legacy:>10,.0f} {compact:>10,.0f} "
+              f"{with_hints:>10,.0f} {legacy / compact:>5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,13 +3,16 @@ import axios from 'axios';
 import type {
     CompleteGameRequest,
     GameState,
+    GhostPosition,
+    Hint,
     LeaderboardEntry,
     LevelConfig,
     NewGameRequest,
+    ProgressResult,
     ProgressUpdate
 } from '../types/game';
 
-const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000/api';
+export const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000/api';
 
 const api = axios.create({
   baseURL: API_BASE_URL,
@@ -39,20 +42,41 @@ export const gameService = {
   },
 
   // Update game progress
-  async updateProgress(gameId: string, foodsCollected: number, timeElapsed: number): Promise<GameState> {
+  async updateProgress(
+    gameId: string,
+    foodsCollected: number,
+    timeElapsed: number,
+    eaten: [number, number][] = [],
+    moves: string = '',
+  ): Promise<ProgressResult> {
     const update: ProgressUpdate = {
       foods_collected: foodsCollected,
       time_elapsed: timeElapsed,
+      eaten,
+      moves,
     };
     const response = await api.post(`/game/${gameId}/progress`, update);
     return response.data;
   },
 
-  // Complete game
-  async completeGame(gameId: string, playerName: string, timeElapsed: number): Promise<GameState> {
+  // Advance server-side ghosts one tick
+  async stepGhosts(gameId: string, player: [number, number]): Promise<{ tick: number; ghosts: GhostPosition[] }> {
+    const response = await api.post(`/game/${gameId}/ghosts`, { player });
+    return response.data;
+  },
+
+  // Get next step towards the nearest food or the goal
+  async getHint(gameId: string, x: number, y: number, target: 'food' | 'goal' = 'food'): Promise<Hint> {
+    const response = await api.get(`/game/${gameId}/hint`, { params: { x, y, target } });
+    return response.data;
+  },
+
+  // Complete game (moves: steps since the last progress update, as U/R/D/L letters)
+  async completeGame(gameId: string, playerName: string, timeElapsed: number, moves: string = ''): Promise<GameState> {
     const request: CompleteGameRequest = {
       player_name: playerName,
       time_elapsed: timeElapsed,
+      moves,
     };
     const response = await api.post(`/game/${gameId}/complete`, request);
     return response.data;
@@ -0,0 +1,130 @@
+// Persistent WebSocket channel for a game session, falling back to REST
+import gameService, { API_BASE_URL } from './gameService';
+import type { GhostPosition, ProgressResult } from '../types/game';
+
+const WS_BASE_URL = API_BASE_URL.replace(/^http/, 'ws');
+const CONNECT_TIMEOUT_MS = 3000;
+
+type Frame = { t: string; [key: string]: unknown };
+type Ack = { t: 'a' | 'e'; s?: number; error?: string; [key: string]: unknown };
+
+export class SessionChannel {
+  private gameId: string;
+  private ws: WebSocket | null = null;
+  private seq = 0;
+  private pending = new Map<number, { resolve: (ack: Ack) => void; reject: (err: Error) => void }>();
+
+  constructor(gameId: string) {
+    this.gameId = gameId;
+  }
+
+  // Open the socket; resolves false (and REST is used) if it can't connect
+  connect(): Promise<boolean> {
+    return new Promise((resolve) => {
+      let settled = false;
+      const settle = (ok: boolean) => {
+        if (!settled) {
+          settled = true;
+          resolve(ok);
+        }
+      };
+
+      try {
+        this.ws = new WebSocket(`${WS_BASE_URL}/game/${this.gameId}/ws`);
+      } catch {
+        this.ws = null;
+        settle(false);
+        return;
+      }
+
+      const timer = window.setTimeout(() => {
+        this.close();
+        settle(false);
+      }, CONNECT_TIMEOUT_MS);
+
+      this.ws.onopen = () => {
+        window.clearTimeout(timer);
+        settle(true);
+      };
+      this.ws.onmessage = (event) => this.handleAck(JSON.parse(event.data));
+      this.ws.onclose = () => {
+        window.clearTimeout(timer);
+        this.ws = null;
+        this.pending.forEach(({ reject }) => reject(new Error('Channel closed')));
+        this.pending.clear();
+        settle(false);
+      };
+    });
+  }
+
+  get connected(): boolean {
+    return this.ws !== null && this.ws.readyState === WebSocket.OPEN;
+  }
+
+  close() {
+    this.ws?.close();
+    this.ws = null;
+  }
+
+  private handleAck(ack: Ack) {
+    if (ack.s === undefined) return;
+    const waiter = this.pending.get(ack.s);
+    if (!waiter) return;
+    this.pending.delete(ack.s);
+    if (ack.t === 'e') {
+      waiter.reject(new Error(ack.error || 'Channel error'));
+    } else {
+      waiter.resolve(ack);
+    }
+  }
+
+  private send(frame: Frame): Promise<Ack> {
+    const s = ++this.seq;
+    return new Promise((resolve, reject) => {
+      this.pending.set(s, { resolve, reject });
+      this.ws!.send(JSON.stringify({ ...frame, s }));
+    });
+  }
+
+  // Report progress: foods collected, elapsed seconds, newly eaten cells
+  // and the moves made since the last report ('U' | 'R' | 'D' | 'L' letters)
+  async updateProgress(
+    foodsCollected: number,
+    timeElapsed: number,
+    eaten: [number, number][] = [],
+    moves: string = '',
+  ): Promise<ProgressResult> {
+    if (!this.connected) {
+      return gameService.updateProgress(this.gameId, foodsCollected, timeElapsed, eaten, moves);
+    }
+    const ack = await this.send({ t: 'p', f: foodsCollected, e: timeElapsed, x: eaten, v: moves });
+    return {
+      id: this.gameId,
+      foods_collected: ack.f as number,
+      score: ack.sc as number,
+      status: ack.st as ProgressResult['status'],
+    };
+  }
+
+  // Report the player's cell and get the ghosts' new cells
+  async move(player: [number, number]): Promise<[number, number][]> {
+    if (!this.connected) {
+      const result = await gameService.stepGhosts(this.gameId, player);
+      return result.ghosts.map((g: GhostPosition) => [g.x, g.y]);
+    }
+    const ack = await this.send({ t: 'm', p: player });
+    return ack.g as [number, number][];
+  }
+
+  // Next step towards the nearest food (or the goal)
+  async hint(player: [number, number], toGoal = false): Promise<{ next: [number, number]; distance: number }> {
+    if (!this.connected) {
+      const hint = await gameService.getHint(this.gameId, player[0], player[1], toGoal ? 'goal' : 'food');
+      return { next: hint.next, distance: hint.distance };
+    }
+    const ack = await this.send({ t: 'h', p: player, g: toGoal ? 1 : 0 });
+    return { next: ack.n as [number, number], distance: ack.d as number };
+  }
+}
+
+export default SessionChannel;
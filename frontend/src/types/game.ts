@@ -53,9 +53,35 @@ export interface NewGameRequest {
 export interface ProgressUpdate {
   foods_collected: number;
   time_elapsed: number;
+  eaten?: [number, number][];
+  moves?: string;
+}
+
+export interface ProgressResult {
+  id: string;
+  foods_collected: number;
+  score: number;
+  status: GameState['status'];
+}
+
+export interface GhostPosition {
+  id: string;
+  type: string;
+  x: number;
+  y: number;
+}
+
+export interface Hint {
+  target: 'food' | 'goal';
+  next: [number, number];
+  distance: number;
+  dead_end: boolean;
+  corridor: number;
+  food?: [number, number];
 }
 
 export interface CompleteGameRequest {
   player_name: string;
   time_elapsed: number;
+  moves?: string;
 }
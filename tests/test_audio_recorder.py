@@ -0,0 +1,104 @@
+"""AudioRecorder against a fake input stream (no audio device needed).
+
+Run from the repo root:
+    python -m unittest tests.test_audio_recorder
+"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import TigerWorld as tw
+
+
+class FakeStream:
+    """Plays back scripted reads: bytes are returned, exceptions raised; then silence."""
+    def __init__(self, script):
+        self.script = list(script)
+        self.reads = 0
+        self.closed = False
+
+    def read(self, frames, exception_on_overflow=True):
+        self.reads += 1
+        if not self.script:
+            time.sleep(0.001)
+            return b''
+        item = self.script.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class AudioRecorderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'run.wav')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def open_wav(self):
+        wf = wave.open(self.path, 'wb')
+        wf.setnchannels(tw.AUDIO_CHANNELS)
+        wf.setsampwidth(tw.AUDIO_SAMPLE_WIDTH)
+        wf.setframerate(tw.AUDIO_RATE)
+        return wf
+
+    def wait_for(self, condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, "timed out")
+            time.sleep(0.005)
+
+    def test_writes_every_chunk_in_order(self):
+        frame_bytes = tw.AUDIO_CHANNELS * tw.AUDIO_SAMPLE_WIDTH
+        chunks = [bytes([i]) * (tw.AUDIO_CHUNK * frame_bytes) for i in range(40)]
+        stream = FakeStream(chunks)
+        recorder = tw.AudioRecorder(stream, self.open_wav())
+        self.wait_for(lambda: not stream.script)
+        recorder.stop()
+
+        with wave.open(self.path, 'rb') as wf:
+            self.assertEqual(wf.readframes(wf.getnframes()), b''.join(chunks))
+        self.assertEqual(recorder.ring.overflows, 0)
+        self.assertTrue(stream.closed)
+
+    def test_failing_stream_backs_off_and_gives_up(self):
+        stream = FakeStream([IOError('device lost')] * 1000)
+        retry, limit = tw.AUDIO_RETRY_SECONDS, tw.AUDIO_RETRY_MAX_SECONDS
+        tw.AUDIO_RETRY_SECONDS, tw.AUDIO_RETRY_MAX_SECONDS = 0.001, 0.002
+        try:
+            recorder = tw.AudioRecorder(stream, self.open_wav())
+            recorder.capture_thread.join(timeout=5.0)
+            self.assertFalse(recorder.capture_thread.is_alive())
+            recorder.stop()
+        finally:
+            tw.AUDIO_RETRY_SECONDS, tw.AUDIO_RETRY_MAX_SECONDS = retry, limit
+
+        self.assertEqual(stream.reads, tw.AUDIO_MAX_READ_ERRORS)
+        self.assertEqual(recorder.read_errors, tw.AUDIO_MAX_READ_ERRORS)
+        self.assertEqual(recorder.frames_written, 0)
+
+    def test_recovers_after_transient_errors(self):
+        frame_bytes = tw.AUDIO_CHANNELS * tw.AUDIO_SAMPLE_WIDTH
+        chunk = b'\x01' * (tw.AUDIO_CHUNK * frame_bytes)
+        stream = FakeStream([IOError('glitch')] * 3 + [chunk] * 5)
+        recorder = tw.AudioRecorder(stream, self.open_wav())
+        self.wait_for(lambda: not stream.script)
+        recorder.stop()
+
+        self.assertEqual(recorder.read_errors, 3)
+        self.assertEqual(recorder.frames_written, 5 * tw.AUDIO_CHUNK)
+
+
+if __name__ == '__main__':
+    unittest.main()
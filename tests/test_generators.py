@@ -0,0 +1,55 @@
+"""Every registered maze generator over a bounded sweep of sizes and seeds.
+
+Run from the repo root:
+    python -m unittest tests.test_generators
+
+The longer sweep is `python -m scripts.check_generators` from backend/.
+"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from maze_engine.generators import GENERATORS, generate_maze
+from scripts.check_generators import check_maze
+
+SIZES = range(2, 32)
+SEEDS = range(20)
+# 0 leaves a perfect maze, 1 removes every candidate wall, None uses the default
+REMOVAL_RATES = (0.0, 1.0, None)
+
+
+class GeneratorTest(unittest.TestCase):
+    def check(self, name, rows, cols, rng, removal_rate=None):
+        maze = generate_maze(name, rows, cols, rng=rng, removal_rate=removal_rate)
+        problem = check_maze(maze, rows, cols)
+        self.assertIsNone(problem, f'{name} {rows}x{cols} removal_rate={removal_rate}: {problem}')
+
+    def test_every_size(self):
+        for name in sorted(GENERATORS):
+            with self.subTest(generator=name):
+                for rows in SIZES:
+                    for cols in SIZES:
+                        # Odd and even sizes on both axes, each removal rate in turn
+                        removal_rate = REMOVAL_RATES[(rows + cols) % len(REMOVAL_RATES)]
+                        self.check(name, rows, cols, random.Random(rows * 1000 + cols), removal_rate)
+
+    def test_seeds_and_removal_rates(self):
+        for name in sorted(GENERATORS):
+            with self.subTest(generator=name):
+                for seed in SEEDS:
+                    for removal_rate in REMOVAL_RATES:
+                        rng = random.Random(seed)
+                        rows, cols = rng.choice(SIZES), rng.choice(SIZES)
+                        self.check(name, rows, cols, rng, removal_rate)
+
+    def test_same_seed_same_maze(self):
+        for name in sorted(GENERATORS):
+            with self.subTest(generator=name):
+                self.assertEqual(generate_maze(name, 15, 21, rng=random.Random(7)),
+                                 generate_maze(name, 15, 21, rng=random.Random(7)))
+
+
+if __name__ == '__main__':
+    unittest.main()